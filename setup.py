@@ -16,7 +16,7 @@ setup(
     author="Marco Bonetti",
     author_email="mbonetti@gmail.com",
     package_dir={"": "src"},
-    packages=["paradedb"],
+    packages=["paradedb", "paradedb.management", "paradedb.management.commands"],
     license="MIT",
     install_requires=["Django >= 4.2", "psycopg2-binary"],
     extras_require={"test": ("tox",)},
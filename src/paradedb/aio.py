@@ -0,0 +1,55 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+
+from django.db import connections
+from django.db.models import QuerySet
+
+
+def run_search(search):
+    """
+    Evaluate a queryset (into a list) or call a function, then close the
+    database connections it opened. Meant to run in a worker thread, which
+    has connections of its own.
+    """
+    try:
+        if isinstance(search, QuerySet):
+            return list(search)
+        return search()
+    finally:
+        connections.close_all()
+
+
+async def gather_searches(*searches, **named_searches):
+    """
+    Run independent searches concurrently, each in its own thread and on its
+    own database connection, so that the total latency is the one of the
+    slowest search rather than the sum of all of them:
+
+    items, reviews = await gather_searches(
+        Item.objects.filter(description__term_search="shoes")[:10],
+        Review.objects.filter(review__term_search="shoes")[:10],
+    )
+
+    results = await gather_searches(
+        books=Book.objects.filter(description__term_search="music").two_phase()[:10],
+        facets=lambda: faceted_search(Book.objects.filter(...), facets={...}),
+    )
+
+    Querysets are evaluated into lists, functions are called without
+    arguments. Positional searches return a list of results, named searches
+    a dict of results. As they don't run on the caller's connection, the
+    searches don't see the caller's uncommitted changes.
+    """
+    if searches and named_searches:
+        raise TypeError("gather_searches() takes either positional or named searches.")
+    names = list(named_searches)
+    results = await asyncio.gather(
+        *(
+            sync_to_async(run_search, thread_sensitive=False)(search)
+            for search in searches or named_searches.values()
+        )
+    )
+    if names:
+        return dict(zip(names, results))
+    return list(results)
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class ParadeDBConfig(AppConfig):
+    name = "paradedb"
+    verbose_name = "ParadeDB"
+
+    def ready(self):
+        from .cache import connect_signals
+
+        connect_signals()
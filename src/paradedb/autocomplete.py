@@ -0,0 +1,84 @@
+from django.db import OperationalError, transaction
+
+from .cache import SearchCache
+from .functions import Score, Search
+from .indexes import get_bm25_index
+
+
+# The suggestions of the hottest prefixes, invalidated along with the
+# cached search results.
+suggestion_cache = SearchCache(maxsize=512, timeout=60)
+
+
+def fetch_with_timeout(queryset, timeout):
+    """
+    Evaluate a queryset with a statement_timeout of ``timeout`` seconds,
+    returning None if it takes longer.
+    """
+    try:
+        with transaction.atomic(using=queryset.db):
+            with transaction.get_connection(queryset.db).cursor() as cursor:
+                cursor.execute(
+                    "SELECT current_setting('statement_timeout'), "
+                    "set_config('statement_timeout', %s, true)",
+                    ["%dms" % max(1, round(timeout * 1000))],
+                )
+                previous = cursor.fetchone()[0]
+                rows = list(queryset)
+                # Within a transaction, the setting would outlive the
+                # savepoint.
+                cursor.execute(
+                    "SELECT set_config('statement_timeout', %s, true)", [previous]
+                )
+            return rows
+    except OperationalError:
+        # The statement was canceled, and the setting rolled back.
+        return None
+
+
+def autocomplete(queryset, field, prefix, limit=10, timeout=0.05, candidates=None):
+    """
+    The ``limit`` best distinct values of ``field`` matching ``prefix``,
+    e.g. the names of the items as one types in a search box:
+
+    autocomplete(Item.objects.all(), "name", "runn")
+    ['Running shoes', 'Running socks', ...]
+
+    The field should be indexed with n-grams, ideally edge n-grams (see
+    BM25NgramIndex), so that the prefix matches the beginning of its terms.
+    All the n-grams of the prefix must match, the values are ranked by
+    score.
+
+    The query is canceled after ``timeout`` seconds, returning no
+    suggestions rather than slowing down the typing. The ``candidates``
+    best matches (5 times ``limit`` by default) are deduplicated into the
+    suggestions, and the suggestions of the hottest prefixes are cached in
+    process until the model is written to.
+    """
+    prefix = " ".join(prefix.split())
+    index = get_bm25_index(queryset.model)
+    if not prefix or index is None:
+        return []
+
+    model_field = queryset.model._meta.get_field(field)
+    tokenizer = index.get_field_config(model_field, "text_fields")["tokenizer"]
+    if len(prefix) < tokenizer.get("min_gram", 1):
+        return []
+
+    matches = (
+        queryset.filter(Search(prefix, fields=[field], match_all_terms=True))
+        .annotate(paradedb_score=Score())
+        .order_by("-paradedb_score")
+        .values_list(field, "paradedb_score")[: candidates or 5 * limit]
+    )
+    rows = suggestion_cache.get_or_fetch(
+        matches, fetch=lambda queryset: fetch_with_timeout(queryset, timeout)
+    )
+
+    suggestions = {}
+    for value, _ in rows or []:
+        if value and value.lower() not in suggestions:
+            suggestions[value.lower()] = value
+            if len(suggestions) >= limit:
+                break
+    return list(suggestions.values())
@@ -0,0 +1,205 @@
+import json
+import multiprocessing
+import time
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.db.models import JSONField
+
+from .cache import invalidate
+from .indexes import get_bm25_index
+from .progress import IndexBuildProgress
+
+
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\n": "\\n", "\r": "\\r", "\t": "\\t"})
+
+
+class BulkLoadReport:
+    def __init__(self, rows, copy_time, index_time):
+        self.rows = rows
+        self.copy_time = copy_time
+        self.index_time = index_time
+
+    def __repr__(self):
+        return "<BulkLoadReport: %d rows copied in %.1fs, index built in %.1fs>" % (
+            self.rows,
+            self.copy_time,
+            self.index_time,
+        )
+
+
+def get_copy_fields(model):
+    """
+    The fields bulk_create() would insert: the concrete fields, except the
+    auto-incremented primary key and generated fields.
+    """
+    opts = model._meta
+    return [
+        field
+        for field in opts.concrete_fields
+        if field is not opts.auto_field and not getattr(field, "generated", False)
+    ]
+
+
+def to_copy_text(value):
+    """
+    Format a value prepared for the database in COPY's text format.
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (list, tuple)):
+        value = "{%s}" % ",".join(
+            "NULL"
+            if item is None
+            else '"%s"' % str(item).replace("\\", "\\\\").replace('"', '\\"')
+            for item in value
+        )
+    return str(value).translate(COPY_ESCAPES)
+
+
+def get_copy_lines(model, rows, fields, connection):
+    """
+    The COPY lines of the rows, prepared as save() would: the rows are made
+    into model instances and the values go through the fields' pre_save(),
+    which sets e.g. the ``auto_now`` and ``auto_now_add`` fields.
+    """
+    for row in rows:
+        if isinstance(row, dict):
+            row = model(**row)
+        elif isinstance(row, (list, tuple)):
+            obj = model()
+            for field, value in zip(fields, row):
+                setattr(obj, field.attname, value)
+            row = obj
+
+        columns = []
+        for field in fields:
+            value = field.pre_save(row, add=True)
+            if isinstance(field, JSONField):
+                value = None if value is None else json.dumps(value, cls=field.encoder)
+            else:
+                value = field.get_db_prep_save(value, connection)
+            columns.append(to_copy_text(value))
+        yield "\t".join(columns) + "\n"
+
+
+class LineStream:
+    """
+    A file-like object reading the lines of a generator, for psycopg2's
+    copy_expert().
+    """
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.buffer = b""
+        self.count = 0
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            line = next(self.lines, None)
+            if line is None:
+                break
+            self.count += 1
+            self.buffer += line.encode()
+        if size < 0:
+            data, self.buffer = self.buffer, b""
+        else:
+            data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def copy_rows(
+    model,
+    rows,
+    fields=None,
+    using=DEFAULT_DB_ALIAS,
+    drop_index=False,
+    progress_interval=10.0,
+):
+    """
+    Insert rows in the model's table with COPY FROM STDIN, streaming them
+    from any iterable (e.g. a generator), which is much faster than
+    bulk_create() for large loads. Each row is a tuple of values in the
+    order of ``fields`` (default: the fields bulk_create() would insert),
+    with the ids of related objects, a dict of keyword arguments of the
+    model, or a model instance:
+
+    copy_rows(Review, ({"item": item, "review": ...} for line in f))
+
+    The values are prepared as by save(), setting the ``auto_now`` and
+    ``auto_now_add`` fields, and the fields missing from dicts default to
+    the fields' defaults.
+
+    With ``drop_index=True``, the model's BM25 index is dropped before the
+    load and built again afterwards, which is faster than updating it for
+    each row, reporting the build progress as AddBM25IndexConcurrently does.
+    The load runs in a transaction, so searches of the table are blocked
+    until the index is built again.
+
+    Returns a BulkLoadReport with the number of rows and the copy and index
+    build times. As no signals are sent, the model's cached search results
+    are invalidated explicitly.
+    """
+    connection = connections[using]
+    fields = [
+        model._meta.get_field(field) if isinstance(field, str) else field
+        for field in (fields or get_copy_fields(model))
+    ]
+    qn = connection.ops.quote_name
+    sql = "COPY %s (%s) FROM STDIN" % (
+        qn(model._meta.db_table),
+        ", ".join(qn(field.column) for field in fields),
+    )
+    index = get_bm25_index(model) if drop_index else None
+    lines = get_copy_lines(model, rows, fields, connection)
+    copy_time = index_time = 0.0
+
+    with transaction.atomic(using=using):
+        if index is not None:
+            with connection.schema_editor() as schema_editor:
+                schema_editor.remove_index(model, index)
+
+        start = time.monotonic()
+        with connection.cursor() as cursor:
+            if is_psycopg3:
+                count = 0
+                with cursor.cursor.copy(sql) as copy:
+                    for line in lines:
+                        copy.write(line)
+                        count += 1
+            else:
+                stream = LineStream(lines)
+                cursor.cursor.copy_expert(sql, stream)
+                count = stream.count
+        copy_time = time.monotonic() - start
+
+        if index is not None:
+            start = time.monotonic()
+            with IndexBuildProgress(
+                using, model._meta.db_table, interval=progress_interval
+            ):
+                with connection.schema_editor() as schema_editor:
+                    schema_editor.add_index(model, index)
+            index_time = time.monotonic() - start
+
+    invalidate(model, using)
+    return BulkLoadReport(count, copy_time, index_time)
+
+
+def parse_in_parallel(parse, items, processes=None, chunksize=1000):
+    """
+    Apply ``parse`` to each item in a pool of worker processes, yielding the
+    results in order and skipping None results, e.g. to parse the lines of
+    a file into the rows passed to copy_rows():
+
+    with open(path) as f:
+        copy_rows(Book, parse_in_parallel(parse_book, f), drop_index=True)
+
+    ``parse`` must be a module level function, so that it can be pickled.
+    """
+    with multiprocessing.Pool(processes) as pool:
+        for result in pool.imap(parse, items, chunksize):
+            if result is not None:
+                yield result
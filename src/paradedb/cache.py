@@ -0,0 +1,225 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.apps import apps
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.db.models.sql import Query
+
+from .indexes import get_bm25_index
+from .instrumentation import TAG_RE
+
+
+GENERATION_KEY = "paradedb:generation:%s"
+RESULTS_KEY = "paradedb:search:%s"
+
+
+def get_generation(model):
+    """
+    The current generation of the model's search results. It is stored in the
+    default Django cache, so that it is shared by all the processes using a
+    shared cache backend, and seeded with the current time so that a value
+    evicted from the cache never comes back.
+    """
+    return caches[DEFAULT_CACHE_ALIAS].get_or_set(
+        GENERATION_KEY % model._meta.concrete_model._meta.label_lower,
+        time.time_ns,
+        None,
+    )
+
+
+def bump_generation(model):
+    cache = caches[DEFAULT_CACHE_ALIAS]
+    for concrete in [model._meta.concrete_model, *model._meta.get_parent_list()]:
+        key = GENERATION_KEY % concrete._meta.label_lower
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), None)
+
+
+def invalidate(model, using=None):
+    """
+    Invalidate the cached search results of the model. Within a transaction,
+    they are invalidated again on commit, so that results cached by other
+    connections before the commit aren't served afterwards.
+    """
+    bump_generation(model)
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(lambda: bump_generation(model), using=using)
+
+
+def _invalidate_on_write(sender, using=None, **kwargs):
+    invalidate(sender, using)
+
+
+def connect_signals():
+    """
+    Invalidate the cached search results of each model with a BM25 index
+    when one of its instances is saved or deleted.
+    """
+    for model in apps.get_models():
+        if get_bm25_index(model) is not None:
+            post_save.connect(
+                _invalidate_on_write, sender=model, dispatch_uid="paradedb_cache"
+            )
+            post_delete.connect(
+                _invalidate_on_write, sender=model, dispatch_uid="paradedb_cache"
+            )
+
+
+def get_tables(query):
+    """
+    The tables a query reads, including those of its subqueries, e.g. of
+    ``pk__in`` lookups and of Subquery and Exists expressions.
+    """
+    tables = {join.table_name for join in query.alias_map.values()}
+    expressions = [
+        query.where,
+        *query.annotations.values(),
+        *(
+            expression
+            for expression in query.order_by
+            if hasattr(expression, "get_source_expressions")
+        ),
+    ]
+    while expressions:
+        expression = expressions.pop()
+        if isinstance(expression, Query):
+            tables |= get_tables(expression)
+        elif hasattr(expression, "get_source_expressions"):
+            expressions.extend(
+                source
+                for source in expression.get_source_expressions()
+                if source is not None
+            )
+    for combined in query.combined_queries:
+        tables |= get_tables(combined)
+    return tables
+
+
+class LRUCache:
+    """
+    A thread safe, in-process least recently used cache.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                return None
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        expires = time.monotonic() + timeout if timeout is not None else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SearchCache:
+    """
+    Caches the ``(pk, score)`` lists of search queries, keyed by their SQL
+    and parameters, in an in-process LRU cache of ``maxsize`` entries and,
+    if ``cache_alias`` is given, in that Django cache too, for ``timeout``
+    seconds.
+
+    The keys include the generation of each model with a BM25 index the
+    query reads, in joins or subqueries, so that saving or deleting instances
+    of these models, or bulk updating them through a ParadeDBQuerySet,
+    invalidates the cached results (this requires ``paradedb`` in
+    ``INSTALLED_APPS``).
+    """
+
+    def __init__(self, maxsize=1024, timeout=300, cache_alias=None):
+        self.timeout = timeout
+        self.cache_alias = cache_alias
+        self.local = LRUCache(maxsize) if maxsize else None
+
+    def get_models(self, query):
+        tables = get_tables(query)
+        return sorted(
+            (
+                model
+                for model in apps.get_models()
+                if model._meta.db_table in tables and get_bm25_index(model) is not None
+            ),
+            key=lambda model: model._meta.label_lower,
+        )
+
+    def make_key(self, queryset):
+        sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+        generations = [
+            (model._meta.label_lower, get_generation(model))
+            for model in self.get_models(queryset.query)
+        ]
+        index = get_bm25_index(queryset.model)
+        key = repr(
+            (
+                queryset.db,
+                queryset.model._meta.label_lower,
+                index.name if index is not None else None,
+                generations,
+                " ".join(TAG_RE.sub("", sql).split()),
+                params,
+            )
+        )
+        return RESULTS_KEY % hashlib.sha256(key.encode()).hexdigest()
+
+    def get_or_fetch(self, queryset, fetch=None):
+        """
+        The rows of ``queryset``, a ``values_list("pk", score)`` queryset,
+        from the cache or from the database, through ``fetch(queryset)``
+        if given. Nothing is cached when ``fetch`` returns None.
+        """
+        key = self.make_key(queryset)
+        if self.local is not None:
+            rows = self.local.get(key)
+            if rows is not None:
+                return rows
+        if self.cache_alias is not None:
+            rows = caches[self.cache_alias].get(key)
+            if rows is not None:
+                if self.local is not None:
+                    self.local.set(key, rows, self.timeout)
+                return rows
+
+        rows = fetch(queryset) if fetch else queryset
+        if rows is None:
+            return None
+        rows = [tuple(row) for row in rows]
+        if self.local is not None:
+            self.local.set(key, rows, self.timeout)
+        if self.cache_alias is not None:
+            caches[self.cache_alias].set(key, rows, self.timeout)
+        return rows
+
+    def clear(self):
+        """
+        Clear the in-process tier. Use ``invalidate(model)`` to invalidate
+        the results of a model in all tiers.
+        """
+        if self.local is not None:
+            self.local.clear()
+
+
+default_cache = SearchCache()
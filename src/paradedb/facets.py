@@ -0,0 +1,192 @@
+from asgiref.sync import sync_to_async
+
+from django.db import connections
+from django.db.models import F
+
+from .functions import Score
+
+
+class TermsFacet:
+    """
+    Counts the hits per distinct value of a field, returning the ``size``
+    most frequent values as ``[{"key": value, "count": n}, ...]``.
+    """
+
+    def __init__(self, field, size=10):
+        self.field = field
+        self.size = size
+
+    def as_sql(self, name, column, qn):
+        ctes = [
+            (
+                f"{qn(name)} AS (SELECT {column} AS key, count(*) AS count "
+                f"FROM paradedb_hits GROUP BY 1 ORDER BY 2 DESC, 1 LIMIT %s)",
+                [self.size],
+            )
+        ]
+        selects = [
+            (f"(SELECT array_agg(key ORDER BY count DESC, key) FROM {qn(name)})", []),
+            (
+                f"(SELECT array_agg(count ORDER BY count DESC, key) FROM {qn(name)})",
+                [],
+            ),
+        ]
+        return ctes, selects
+
+    def parse(self, keys, counts):
+        return [
+            {"key": key, "count": count} for key, count in zip(keys or [], counts or [])
+        ]
+
+
+class RangeFacet:
+    """
+    Counts the hits falling in each of the given ``(from, to)`` ranges of a
+    field (``from`` inclusive, ``to`` exclusive, None for an open bound),
+    returning ``[{"from": from, "to": to, "count": n}, ...]``.
+    """
+
+    def __init__(self, field, ranges):
+        self.field = field
+        self.ranges = list(ranges)
+
+    def as_sql(self, name, column, qn):
+        selects = []
+        for start, end in self.ranges:
+            conditions, params = [], []
+            if start is not None:
+                conditions.append(f"{column} >= %s")
+                params.append(start)
+            if end is not None:
+                conditions.append(f"{column} < %s")
+                params.append(end)
+            if not conditions:
+                conditions.append(f"{column} IS NOT NULL")
+            selects.append(
+                (
+                    "(SELECT count(*) FROM paradedb_hits WHERE %s)"
+                    % " AND ".join(conditions),
+                    params,
+                )
+            )
+        return [], selects
+
+    def parse(self, *counts):
+        return [
+            {"from": start, "to": end, "count": count}
+            for (start, end), count in zip(self.ranges, counts)
+        ]
+
+
+class FacetedResult:
+    def __init__(self, hits, total, facets):
+        self.hits = hits
+        self.total = total
+        self.facets = facets
+
+    def __repr__(self):
+        return "<FacetedResult: %d hits of %d, facets: %s>" % (
+            len(self.hits),
+            self.total,
+            ", ".join(self.facets),
+        )
+
+
+def faceted_search(queryset, facets, limit=10, score_name="score"):
+    """
+    Returns the top ``limit`` hits of a ParadeDB search queryset, ordered by
+    score, along with the total hit count and the counts of the given
+    facets, all computed from a single execution of the search:
+
+    WITH paradedb_hits AS MATERIALIZED (
+        SELECT id, paradedb.score(id) AS score, publication_year AS facet_0
+        FROM books WHERE description @@@ 'music'
+    ),
+    paradedb_top AS (SELECT * FROM paradedb_hits ORDER BY score DESC LIMIT 10)
+    SELECT
+        (SELECT count(*) FROM paradedb_hits),
+        (SELECT array_agg(id ORDER BY score DESC, id) FROM paradedb_top),
+        (SELECT array_agg(score ORDER BY score DESC, id) FROM paradedb_top),
+        (SELECT count(*) FROM paradedb_hits WHERE facet_0 < 2000),
+        (SELECT count(*) FROM paradedb_hits WHERE facet_0 >= 2000);
+
+    faceted_search(
+        Book.objects.filter(description__term_search="music"),
+        facets={
+            "year": RangeFacet("publication_year", [(None, 2000), (2000, None)]),
+            "isbn": TermsFacet("isbn", size=5),
+        },
+    )
+
+    The hits are then loaded by primary key, without running the search
+    again.
+    """
+    model = queryset.model
+    columns = {f"facet_{i}": F(facet.field) for i, facet in enumerate(facets.values())}
+    inner = queryset.order_by().values(
+        paradedb_pk=F("pk"), paradedb_score=Score(), **columns
+    )
+    inner_sql, inner_params = inner.query.get_compiler(queryset.db).as_sql()
+
+    connection = connections[queryset.db]
+    qn = connection.ops.quote_name
+
+    ctes = [
+        (f"paradedb_hits AS MATERIALIZED ({inner_sql})", list(inner_params)),
+        (
+            "paradedb_top AS (SELECT paradedb_pk, paradedb_score FROM paradedb_hits "
+            "ORDER BY paradedb_score DESC, paradedb_pk LIMIT %s)",
+            [limit],
+        ),
+    ]
+    selects = [
+        ("(SELECT count(*) FROM paradedb_hits)", []),
+        (
+            "(SELECT array_agg(paradedb_pk ORDER BY paradedb_score DESC, paradedb_pk) "
+            "FROM paradedb_top)",
+            [],
+        ),
+        (
+            "(SELECT array_agg(paradedb_score ORDER BY paradedb_score DESC, "
+            "paradedb_pk) FROM paradedb_top)",
+            [],
+        ),
+    ]
+    arity = []
+    for (name, facet), column in zip(facets.items(), columns):
+        facet_ctes, facet_selects = facet.as_sql(
+            f"paradedb_facet_{len(arity)}", qn(column), qn
+        )
+        ctes.extend(facet_ctes)
+        selects.extend(facet_selects)
+        arity.append((name, facet, len(facet_selects)))
+
+    sql = "WITH %s SELECT %s" % (
+        ", ".join(cte for cte, _ in ctes),
+        ", ".join(select for select, _ in selects),
+    )
+    params = [p for _, cte_params in ctes for p in cte_params]
+    params += [p for _, select_params in selects for p in select_params]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+
+    total, pks, scores = row[0], row[1] or [], row[2] or []
+    objects = model._base_manager.using(queryset.db).in_bulk(pks)
+    hits = []
+    for pk, score in zip(pks, scores):
+        obj = objects.get(pk)
+        if obj is not None:
+            setattr(obj, score_name, score)
+            hits.append(obj)
+
+    results, offset = {}, 3
+    for name, facet, count in arity:
+        results[name] = facet.parse(*row[offset : offset + count])
+        offset += count
+    return FacetedResult(hits, total, results)
+
+
+async def afaceted_search(queryset, facets, limit=10, score_name="score"):
+    return await sync_to_async(faceted_search)(queryset, facets, limit, score_name)
@@ -0,0 +1,94 @@
+from django.db.models import QuerySet, TextField, Value
+from django.db.models.functions import Cast
+
+from .functions import Score, Search
+
+
+def get_branch(source, query, index, limit, match_all_terms):
+    fields = None
+    if isinstance(source, tuple):
+        source, fields = source
+    if not isinstance(source, QuerySet):
+        source = source._default_manager.all()
+    return (
+        source.filter(Search(query, fields=fields, match_all_terms=match_all_terms))
+        .order_by()
+        .values(
+            paradedb_source=Value(index),
+            paradedb_pk=Cast("pk", TextField()),
+            paradedb_score=Score(),
+        )
+        .order_by("-paradedb_score")[:limit]
+    )
+
+
+def federated_search(
+    query, sources, limit=10, score_name="score", match_all_terms=False
+):
+    """
+    Search several models at once, returning the ``limit`` best matches of
+    all of them, ranked by score. Each source is a model or a queryset,
+    optionally paired with the fields to search (all the fields of its BM25
+    index by default):
+
+    federated_search(
+        "running shoes",
+        [
+            (Item, ["name", "description"]),
+            (Review.objects.filter(item__rating__gte=4), ["review"]),
+            Book,
+        ],
+        limit=10,
+    )
+
+    The ranking is computed by a single query, in which each model only
+    contributes its own top ``limit`` matches:
+
+    (SELECT 0, id::text, paradedb.score(id) FROM mock_items WHERE ...
+     ORDER BY 3 DESC LIMIT 10)
+    UNION ALL
+    (SELECT 1, id::text, paradedb.score(id) FROM reviews WHERE ...
+     ORDER BY 3 DESC LIMIT 10)
+    UNION ALL
+    ...
+    ORDER BY 3 DESC LIMIT 10;
+
+    The matching instances are then loaded by primary key, with one query per
+    model, and annotated with their score. Note that the scores of different
+    indexes are only roughly comparable, as they depend on the statistics of
+    each index.
+    """
+    branches = [
+        get_branch(source, query, index, limit, match_all_terms)
+        for index, source in enumerate(sources)
+    ]
+    if not branches:
+        return []
+
+    ranking = (
+        branches[0]
+        .union(*branches[1:], all=True)
+        .order_by("-paradedb_score", "paradedb_source", "paradedb_pk")[:limit]
+    )
+    rows = list(ranking)
+
+    pks = {}
+    for row in rows:
+        pks.setdefault(row["paradedb_source"], []).append(row["paradedb_pk"])
+    objects = {}
+    for index, source_pks in pks.items():
+        model = branches[index].model
+        pk_field = model._meta.pk
+        in_bulk = model._base_manager.using(branches[index].db).in_bulk(
+            [pk_field.to_python(pk) for pk in source_pks]
+        )
+        for pk, obj in in_bulk.items():
+            objects[index, str(pk)] = obj
+
+    results = []
+    for row in rows:
+        obj = objects.get((row["paradedb_source"], row["paradedb_pk"]))
+        if obj is not None:
+            setattr(obj, score_name, row["paradedb_score"])
+            results.append(obj)
+    return results
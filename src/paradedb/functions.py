@@ -1,5 +1,10 @@
-from django.db.models import CharField, FloatField
-from django.db.models.expressions import Func
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import BooleanField, CharField, F, FloatField, Model
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import Expression, Func, Value
+
+from .indexes import get_bm25_index
+from .instrumentation import tag_sql
 
 
 class Score(Func):
@@ -11,27 +16,117 @@ class Score(Func):
     WHERE description @@@ 'shoes'
     ORDER BY score DESC
     LIMIT 5;
-    """
 
-    def __init__(self, field=None, *args, **kwargs):
-        self._field = field
-        super().__init__(*args, **kwargs)
+    The score is computed on the key field of the queried model, or of the
+    model the given field belongs to, e.g. Score("item__description") on
+    Review. The table is the one joined by the search lookup on that field:
+    Score doesn't add joins, and raises a ValueError if there's none.
+
+    Given several fields, the scores of their indexes are combined with
+    ``combine="sum"`` (default) or ``combine="max"``, optionally multiplied
+    by ``weights``, with a missing score counting as 0:
+
+    Review.objects.filter(
+        review__term_search="shoes", item__description__term_search="shoes"
+    ).annotate(
+        score=Score("review", "item__description", weights=[1.0, 2.0])
+    ).order_by("-score")
+    """
 
+    combines = ("sum", "max")
     output_field = FloatField()
 
+    def __init__(
+        self, *fields, field=None, combine="sum", weights=None, output_field=None
+    ):
+        if field is not None:
+            if fields:
+                raise TypeError("Score takes either fields or field, not both.")
+            fields = (field,)
+        if combine not in self.combines:
+            raise ValueError("combine must be one of %s." % ", ".join(self.combines))
+        if weights is not None and len(weights) != max(len(fields), 1):
+            raise ValueError("Score expects a weight for each field.")
+        self.fields = fields
+        self.combine = combine
+        self.weights = weights
+        self.resolved = False
+        super().__init__(output_field=output_field)
+
+    def resolve_expression(
+        self, query=None, allow_joins=True, reuse=None, summarize=False, for_save=False
+    ):
+        c = super().resolve_expression(query, allow_joins, reuse, summarize, for_save)
+        if c.resolved:
+            # Resolved again as a subquery of an outer query: the columns
+            # (relabeled by then) belong to the subquery, not to ``query``.
+            return c
+        c.resolved = True
+        # The relations may only be joined by lookups filtered on afterwards,
+        # in which case the columns are looked up when compiling.
+        columns = c.get_key_cols(query)
+        if None not in columns:
+            c.set_source_expressions(columns)
+        return c
+
+    def get_key_cols(self, query):
+        return [self.get_key_col(query, field) for field in self.fields or [None]]
+
+    def get_key_col(self, query, field):
+        """
+        The key field column of the table the field belongs to, or None if
+        the query doesn't join it. No join is added, as it could change the
+        rows of the query: the search lookups join the searched tables.
+        """
+        alias, opts = query.get_initial_alias(), query.get_meta()
+        if field is not None:
+            path = query.names_to_path(
+                field.split(LOOKUP_SEP), opts, fail_on_missing=True
+            )[0]
+            for info in path:
+                alias = next(
+                    (
+                        join_alias
+                        for join_alias, join in query.alias_map.items()
+                        if getattr(join, "parent_alias", None) == alias
+                        and join.join_field == info.join_field
+                    ),
+                    None,
+                )
+                if alias is None:
+                    return None
+                opts = info.to_opts
+        index = get_bm25_index(opts.model)
+        key = index.get_key_field(opts.model) if index else opts.pk
+        return key.get_col(alias)
+
     def as_sql(self, compiler, connection, **extra_context):
-        # This is mighty nasty.
-        _table_name = compiler.query.model._meta.db_table
-        _field_name = compiler.query.model._meta.pk.name
-        if self._field is not None and "__" in self._field:
-            for table_name, ds in compiler.query.alias_map.items():
-                if hasattr(ds, "join_field") and self._field.startswith(
-                    f"{ds.join_field.name}__"
-                ):
-                    _table_name = table_name
-                    break
+        scores, params = [], []
+        columns = self.get_source_expressions() or self.get_key_cols(compiler.query)
+        for field, column in zip(self.fields, columns):
+            if column is None:
+                raise ValueError(
+                    "Score(%r): the query doesn't join the table of %r, search "
+                    "it with a lookup, e.g. filter(%s__term_search=...)."
+                    % (field, field, field)
+                )
+        for i, column in enumerate(columns):
+            column_sql, column_params = compiler.compile(column)
+            sql = f"paradedb.score({column_sql})"
+            if len(columns) > 1:
+                sql = f"COALESCE({sql}, 0)"
+            if self.weights is not None:
+                # A float4 weight keeps the score a float4 (see KeysetPaginator).
+                sql = f"%s::real * {sql}"
+                params.append(self.weights[i])
+            scores.append(sql)
+            params.extend(column_params)
 
-        return f"paradedb.score({_table_name}.{_field_name})", []
+        if len(scores) == 1:
+            return scores[0], params
+        if self.combine == "max":
+            return "GREATEST(%s)" % ", ".join(scores), params
+        return "(%s)" % " + ".join(scores), params
 
 
 class Highlight(Func):
@@ -42,20 +137,332 @@ class Highlight(Func):
     FROM mock_items
     WHERE description @@@ 'shoes'
     LIMIT 5;
+
+    The field is resolved through the ORM, so fields of related models can be
+    highlighted, e.g. Highlight("item__description"). Use ``limit`` and
+    ``offset`` to pick which of the highlighted fragments are returned.
     """
 
+    function = "paradedb.snippet"
+
     def __init__(
-        self, field, start_tag="<em>", end_tag="</em>", max_num_chars=150, **kwargs
+        self,
+        field,
+        start_tag="<em>",
+        end_tag="</em>",
+        max_num_chars=150,
+        limit=None,
+        offset=None,
+        **kwargs,
     ):
         self._start_tag = start_tag
         self._end_tag = end_tag
         self._max_num_chars = max_num_chars
-        self._field = field
-        super().__init__(**kwargs, output_field=CharField())
+        self._limit = limit
+        self._offset = offset
+        if isinstance(field, str):
+            field = F(field)
+        super().__init__(field, **kwargs, output_field=CharField())
 
     def as_sql(self, compiler, connection, **extra_context):
-        return (
-            f"paradedb.snippet({self._field}, "
+        field_sql, params = compiler.compile(self.source_expressions[0])
+        sql = (
+            f"{self.function}({field_sql}, "
             f"start_tag => %s, end_tag => %s, "
-            f"max_num_chars => %s)"
-        ), [self._start_tag, self._end_tag, self._max_num_chars]
+            f"max_num_chars => %s"
+        )
+        params = [*params, self._start_tag, self._end_tag, self._max_num_chars]
+        if self._limit is not None:
+            sql += ', "limit" => %s'
+            params.append(self._limit)
+        if self._offset is not None:
+            sql += ', "offset" => %s'
+            params.append(self._offset)
+        return f"{sql})", params
+
+
+class Snippets(Highlight):
+    """
+    https://docs.paradedb.com/documentation/full-text/highlighting
+
+    Like Highlight, but returns all the highlighted fragments of the field
+    (up to ``limit``) as a list:
+
+    SELECT id, paradedb.snippets(description, max_num_chars => 50)
+    FROM mock_items
+    WHERE description @@@ 'shoes';
+    """
+
+    function = "paradedb.snippets"
+
+    def __init__(self, field, **kwargs):
+        super().__init__(field, **kwargs)
+        self.output_field = ArrayField(CharField())
+
+
+class Search(Expression):
+    """
+    Searches all the text fields of the model's BM25 index (or the given
+    subset of them) with a single query against the index's key field,
+    optionally boosting some of the fields:
+
+    Item.objects.filter(
+        Search("shoes", fields=["name", "description"], boosts={"name": 2})
+    )
+
+    SELECT description, rating, category
+    FROM mock_items
+    WHERE id @@@ paradedb.boolean(should => ARRAY[
+        paradedb.boost(
+            factor => 2,
+            query => paradedb.match(field => 'name', value => 'shoes')
+        ),
+        paradedb.match(field => 'description', value => 'shoes')
+    ]);
+    """
+
+    output_field = BooleanField()
+    conditional = True
+    tag = "search"
+
+    def __init__(self, query, fields=None, boosts=None, match_all_terms=False):
+        self.query = query
+        self.fields = fields
+        self.boosts = boosts or {}
+        self.match_all_terms = match_all_terms
+        super().__init__()
+
+    def __repr__(self):
+        return "%s(%r, fields=%r)" % (self.__class__.__name__, self.query, self.fields)
+
+    def resolve_expression(
+        self, query=None, allow_joins=True, reuse=None, summarize=False, for_save=False
+    ):
+        c = super().resolve_expression(query, allow_joins, reuse, summarize, for_save)
+        c.model = query.model
+        c.alias = query.get_initial_alias()
+        c.index = get_bm25_index(query.model)
+        if c.index is None:
+            raise ValueError(
+                "%s has no BM25 index to search." % query.model._meta.label
+            )
+        return c
+
+    def get_search_fields(self, connection):
+        fields = self.fields or self.index.get_text_fields(self.model, connection)
+        unknown = set(fields) - set(self.index.fields)
+        if unknown:
+            raise ValueError(
+                "%s are not fields of the %s index."
+                % (", ".join(sorted(unknown)), self.index.name)
+            )
+        return fields
+
+    def get_match_options(self):
+        """
+        The named arguments of paradedb.match(), besides field and value.
+        """
+        return {"conjunction_mode": self.match_all_terms}
+
+    def as_sql(self, compiler, connection):
+        qn = connection.ops.quote_name
+        options = self.get_match_options()
+        queries, params = [], []
+        for name in self.get_search_fields(connection):
+            query = "paradedb.match(field => %%s, value => %%s, %s)" % ", ".join(
+                f"{option} => %s" for option in options
+            )
+            query_params = [
+                self.model._meta.get_field(name).column,
+                self.query,
+                *options.values(),
+            ]
+            if self.boosts.get(name) is not None:
+                query = f"paradedb.boost(factor => %s, query => {query})"
+                query_params.insert(0, self.boosts[name])
+            queries.append(query)
+            params.extend(query_params)
+
+        key = self.index.get_key_field(self.model)
+        return tag_sql(
+            f"{qn(self.alias)}.{qn(key.column)} @@@ "
+            f"paradedb.boolean(should => ARRAY[{', '.join(queries)}])",
+            [self.tag],
+            [self.index.name],
+            connection,
+        ), params
+
+
+class Fuzzy(Search):
+    """
+    A Search matching the terms within ``distance`` edits (1 or 2) of the
+    query terms, e.g. to tolerate typos. ``prefix=True`` matches the terms
+    starting with such a term, and ``transposition_cost_one=False`` counts
+    swapping two adjacent characters as two edits instead of one:
+
+    Item.objects.filter(Fuzzy("runing shoez", fields=["name"], distance=1))
+
+    SELECT description, rating, category
+    FROM mock_items
+    WHERE id @@@ paradedb.boolean(should => ARRAY[
+        paradedb.match(field => 'name', value => 'runing shoez',
+            conjunction_mode => false, distance => 1,
+            transposition_cost_one => true, prefix => false)
+    ]);
+
+    Each additional edit makes the query notably more expensive: prefer
+    ``distance=1`` for long fields.
+    """
+
+    tag = "fuzzy"
+
+    def __init__(
+        self,
+        query,
+        fields=None,
+        boosts=None,
+        match_all_terms=False,
+        distance=1,
+        prefix=False,
+        transposition_cost_one=True,
+    ):
+        super().__init__(query, fields, boosts, match_all_terms)
+        self.distance = distance
+        self.prefix = prefix
+        self.transposition_cost_one = transposition_cost_one
+
+    def __repr__(self):
+        return "%s(%r, fields=%r, distance=%r)" % (
+            self.__class__.__name__,
+            self.query,
+            self.fields,
+            self.distance,
+        )
+
+    def get_match_options(self):
+        return {
+            **super().get_match_options(),
+            "distance": self.distance,
+            "transposition_cost_one": self.transposition_cost_one,
+            "prefix": self.prefix,
+        }
+
+
+class MoreLikeThis(Expression):
+    """
+    https://docs.paradedb.com/documentation/advanced/specialized/more-like-this
+
+    Matches the documents similar to a document of the index, given as a
+    model instance or its key (the primary key by default), excluding the
+    document itself unless ``exclude_document=False``:
+
+    Book.objects.filter(MoreLikeThis(book, max_query_terms=10)).annotate(
+        score=Score()
+    ).order_by("-score")[:5]
+
+    SELECT ... FROM books
+    WHERE (id @@@ paradedb.more_like_this(document_id => 42::integer,
+        max_query_terms => 10) AND id <> 42::integer)
+    ORDER BY paradedb.score(id) DESC LIMIT 5;
+
+    The query is made of the document's most distinctive terms: at most
+    ``max_query_terms`` of them, among those appearing ``min_term_frequency``
+    times or more in the document and in between ``min_doc_frequency`` and
+    ``max_doc_frequency`` documents, with ``min_word_length`` to
+    ``max_word_length`` characters. Fewer terms make a cheaper query. The
+    options left to None use ParadeDB's defaults.
+
+    The document can also be an expression, e.g. OuterRef("pk") in a
+    subquery (see paradedb.recommendations.recommend).
+    """
+
+    output_field = BooleanField()
+    conditional = True
+    tag = "more_like_this"
+    options = (
+        "min_term_frequency",
+        "max_query_terms",
+        "min_doc_frequency",
+        "max_doc_frequency",
+        "min_word_length",
+        "max_word_length",
+    )
+
+    def __init__(
+        self,
+        document,
+        max_query_terms=25,
+        min_doc_frequency=None,
+        max_doc_frequency=None,
+        min_term_frequency=None,
+        min_word_length=None,
+        max_word_length=None,
+        exclude_document=True,
+    ):
+        self.document = document
+        self.max_query_terms = max_query_terms
+        self.min_doc_frequency = min_doc_frequency
+        self.max_doc_frequency = max_doc_frequency
+        self.min_term_frequency = min_term_frequency
+        self.min_word_length = min_word_length
+        self.max_word_length = max_word_length
+        self.exclude_document = exclude_document
+        self.key = None
+        super().__init__()
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self.document)
+
+    def get_source_expressions(self):
+        return [self.key, self.document] if self.key is not None else []
+
+    def set_source_expressions(self, exprs):
+        if exprs:
+            self.key, self.document = exprs
+
+    def resolve_expression(
+        self, query=None, allow_joins=True, reuse=None, summarize=False, for_save=False
+    ):
+        if self.key is not None:
+            # Resolved again as a subquery of an outer query, e.g. to
+            # resolve an OuterRef document.
+            return super().resolve_expression(
+                query, allow_joins, reuse, summarize, for_save
+            )
+
+        c = self.copy()
+        c.index = get_bm25_index(query.model)
+        if c.index is None:
+            raise ValueError(
+                "%s has no BM25 index to search." % query.model._meta.label
+            )
+        key = c.index.get_key_field(query.model)
+        document = c.document
+        if isinstance(document, Model):
+            document = getattr(document, key.attname)
+        if not hasattr(document, "resolve_expression"):
+            document = Value(document)
+        c.key = key.get_col(query.get_initial_alias())
+        c.document = document.resolve_expression(query, allow_joins, reuse, summarize)
+        return c
+
+    def as_sql(self, compiler, connection):
+        key_sql, key_params = compiler.compile(self.key)
+        document_sql, document_params = compiler.compile(self.document)
+        document_sql = "(%s)::%s" % (
+            document_sql,
+            self.key.target.cast_db_type(connection),
+        )
+
+        arguments = [f"document_id => {document_sql}"]
+        params = [*key_params, *document_params]
+        for option in self.options:
+            if getattr(self, option) is not None:
+                arguments.append(f"{option} => %s")
+                params.append(getattr(self, option))
+
+        sql = f"{key_sql} @@@ paradedb.more_like_this({', '.join(arguments)})"
+        if self.exclude_document:
+            sql = f"({sql} AND {key_sql} <> {document_sql})"
+            params.extend([*key_params, *document_params])
+        return tag_sql(sql, [self.tag], [self.index.name], connection), params
@@ -0,0 +1,131 @@
+from django.db import connections
+from django.db.models import F, QuerySet
+
+from .functions import Score, Search
+
+
+FUSIONS = ("rrf", "weighted")
+
+HYBRID_SQL = """
+WITH paradedb_bm25 AS (
+    SELECT paradedb_pk, ROW_NUMBER() OVER (ORDER BY paradedb_score DESC)
+        AS paradedb_rank,
+        COALESCE(paradedb_score / NULLIF(MAX(paradedb_score) OVER (), 0), 1)
+        AS paradedb_norm
+    FROM (%(bm25)s) AS paradedb_branch
+), paradedb_vector AS (
+    SELECT paradedb_pk, ROW_NUMBER() OVER (ORDER BY paradedb_score ASC)
+        AS paradedb_rank,
+        COALESCE(
+            (MAX(paradedb_score) OVER () - paradedb_score)
+            / NULLIF(MAX(paradedb_score) OVER () - MIN(paradedb_score) OVER (), 0),
+            1
+        ) AS paradedb_norm
+    FROM (%(vector)s) AS paradedb_branch
+    WHERE paradedb_score IS NOT NULL
+), paradedb_fused AS (
+    SELECT COALESCE(b.paradedb_pk, v.paradedb_pk) AS paradedb_pk,
+        %(score)s AS paradedb_score
+    FROM paradedb_bm25 b
+    FULL OUTER JOIN paradedb_vector v ON b.paradedb_pk = v.paradedb_pk
+)
+SELECT %(table)s.*, f.paradedb_score AS %(score_name)s
+FROM paradedb_fused f
+INNER JOIN %(table)s ON %(table)s.%(pk)s = f.paradedb_pk
+ORDER BY f.paradedb_score DESC, f.paradedb_pk
+LIMIT %%s
+"""
+
+RRF_SQL = (
+    "COALESCE(%s::float8 / (%s + b.paradedb_rank), 0)"
+    " + COALESCE(%s::float8 / (%s + v.paradedb_rank), 0)"
+)
+
+WEIGHTED_SQL = (
+    "%s::float8 * COALESCE(b.paradedb_norm, 0)"
+    " + %s::float8 * COALESCE(v.paradedb_norm, 0)"
+)
+
+
+def hybrid_search(
+    source,
+    query,
+    distance,
+    fields=None,
+    limit=10,
+    top_k=100,
+    fusion="rrf",
+    rrf_k=60,
+    weights=(1.0, 1.0),
+    match_all_terms=False,
+    score_name="score",
+):
+    """
+    Rank the instances of a model (or of a queryset) by both a BM25 search
+    and a vector ``distance`` expression (lower is closer), e.g. pgvector's
+    CosineDistance, returning the ``limit`` best ones, annotated with their
+    fused score, in a single query:
+
+    hybrid_search(
+        Item.objects.filter(rating__gte=4),
+        "running shoes",
+        CosineDistance("embedding", embedding),
+        fields=["name", "description"],
+        limit=20,
+    )
+
+    The BM25 search and the nearest neighbour search each contribute their
+    own top ``top_k`` rows, which an ORDER BY ... LIMIT lets Postgres read
+    from the BM25 and vector indexes. They are then fused with either:
+
+    - ``fusion="rrf"``, reciprocal rank fusion: the sum over both sides of
+      weight / (rrf_k + rank), which doesn't depend on the scales of the
+      BM25 score and of the distance.
+    - ``fusion="weighted"``: the weighted sum of the BM25 score divided by
+      the best one and of the distance rescaled between the farthest (0) and
+      the closest (1) neighbours.
+
+    ``weights`` are the weights of the BM25 and vector sides. Returns a
+    RawQuerySet, so filter the source rather than the results.
+    """
+    if fusion not in FUSIONS:
+        raise ValueError("fusion must be one of %s." % ", ".join(FUSIONS))
+    if not isinstance(source, QuerySet):
+        source = source._default_manager.all()
+
+    model = source.model
+    bm25 = (
+        source.filter(Search(query, fields=fields, match_all_terms=match_all_terms))
+        .order_by()
+        .values(paradedb_pk=F("pk"), paradedb_score=Score())
+        .order_by("-paradedb_score")[:top_k]
+    )
+    vector = (
+        source.order_by()
+        .values(paradedb_pk=F("pk"), paradedb_score=distance)
+        .order_by("paradedb_score")[:top_k]
+    )
+    bm25_sql, bm25_params = bm25.query.get_compiler(source.db).as_sql()
+    vector_sql, vector_params = vector.query.get_compiler(source.db).as_sql()
+
+    bm25_weight, vector_weight = (float(weight) for weight in weights)
+    if fusion == "rrf":
+        score_sql = RRF_SQL
+        score_params = (bm25_weight, rrf_k, vector_weight, rrf_k)
+    else:
+        score_sql = WEIGHTED_SQL
+        score_params = (bm25_weight, vector_weight)
+
+    qn = connections[source.db].ops.quote_name
+    sql = HYBRID_SQL % {
+        "bm25": bm25_sql,
+        "vector": vector_sql,
+        "score": score_sql,
+        "table": qn(model._meta.db_table),
+        "pk": qn(model._meta.pk.column),
+        "score_name": qn(score_name),
+    }
+    return model._base_manager.db_manager(source.db).raw(
+        sql,
+        (*bm25_params, *vector_params, *score_params, limit),
+    )
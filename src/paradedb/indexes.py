@@ -3,23 +3,151 @@ import json
 from django.contrib.postgres.indexes import PostgresIndex
 
 
+# Maps Django's internal field types to the ParadeDB field configuration
+# they are indexed under (text fields are detected by their column type).
+FIELD_TYPES = {
+    "AutoField": "numeric_fields",
+    "BigAutoField": "numeric_fields",
+    "SmallAutoField": "numeric_fields",
+    "IntegerField": "numeric_fields",
+    "BigIntegerField": "numeric_fields",
+    "SmallIntegerField": "numeric_fields",
+    "PositiveIntegerField": "numeric_fields",
+    "PositiveBigIntegerField": "numeric_fields",
+    "PositiveSmallIntegerField": "numeric_fields",
+    "FloatField": "numeric_fields",
+    "DecimalField": "numeric_fields",
+    "BooleanField": "boolean_fields",
+    "DateField": "datetime_fields",
+    "DateTimeField": "datetime_fields",
+    "JSONField": "json_fields",
+}
+
+RECORD_OPTIONS = ("basic", "freq", "position")
+
+NGRAM_OPTIONS = ("min_gram", "max_gram", "prefix_only")
+
+
 class BM25Index(PostgresIndex):
+    """
+    https://docs.paradedb.com/documentation/indexing/create_index
+
+    Text, numeric, boolean, datetime and JSON fields are configured
+    according to their Django field type, and are all fast fields by
+    default. Use ``field_options`` to override the configuration of
+    individual fields, e.g. to only index a numeric field without storing
+    it in the columnar (fast) storage:
+
+    BM25Index(
+        fields=["name", "description", "rating"],
+        name="item_idx",
+        field_options={"rating": {"fast": False, "indexed": True}},
+    )
+
+    Text fields additionally accept ``tokenizer`` (a tokenizer name or a
+    full tokenizer configuration), ``stemmer`` (None disables stemming),
+    ``normalizer`` and ``record`` ("basic" only records the documents a
+    term appears in, "freq" adds term frequencies and "position", the
+    default, adds the positions phrase searches need):
+
+    BM25Index(
+        fields=["name", "description", "isbn"],
+        name="book_idx",
+        field_options={
+            "isbn": {"tokenizer": "keyword", "record": "basic", "fast": False},
+            "name": {"stemmer": None, "normalizer": "lowercase"},
+        },
+    )
+    """
+
     suffix = "bm25"
 
     def __init__(self, *expressions, **kwargs):
         self._key_field = kwargs.pop("key_field", None)
         self._stemmer = kwargs.pop("stemmer", "English")
+        self._field_options = kwargs.pop("field_options", None) or {}
         super().__init__(*expressions, **kwargs)
 
-    def _get_tokenizer(self):
+        unknown = set(self._field_options) - set(self.fields)
+        if unknown:
+            raise ValueError(
+                "BM25Index.field_options refers to fields not in the index: %s."
+                % ", ".join(sorted(unknown))
+            )
+        for name, options in self._field_options.items():
+            if options.get("record", "position") not in RECORD_OPTIONS:
+                raise ValueError(
+                    "BM25Index.field_options: record must be one of %s (got %r "
+                    "for %s)." % (", ".join(RECORD_OPTIONS), options["record"], name)
+                )
+
+    def deconstruct(self):
+        path, args, kwargs = super().deconstruct()
+        if self._key_field:
+            kwargs["key_field"] = self._key_field
+        if self._stemmer != "English":
+            kwargs["stemmer"] = self._stemmer
+        if self._field_options:
+            kwargs["field_options"] = self._field_options
+        return path, args, kwargs
+
+    def _get_tokenizer(self, options):
+        """
+        The default tokenizer of a text field, given its options (from which
+        the tokenizer's own options are removed).
+        """
         return {"type": "default", "stemmer": self._stemmer}
 
+    def get_field_type(self, field, connection):
+        """
+        The ParadeDB field configuration (text_fields, numeric_fields...)
+        the model field is indexed under, or None if it can't be.
+        """
+        if field.is_relation:
+            field = field.target_field
+        db_type = field.db_type(connection) or ""
+        if db_type == "text" or db_type.startswith("varchar"):
+            return "text_fields"
+        return FIELD_TYPES.get(field.get_internal_type())
+
+    def get_field_config(self, field, field_type):
+        options = dict(self._field_options.get(field.name, {}))
+        if field_type != "text_fields":
+            return {"fast": True, "indexed": True, **options}
+
+        tokenizer = options.pop("tokenizer", None)
+        if tokenizer is None:
+            tokenizer = self._get_tokenizer(options)
+        elif isinstance(tokenizer, str):
+            tokenizer = {"type": tokenizer}
+        else:
+            tokenizer = dict(tokenizer)
+
+        if "stemmer" in options:
+            stemmer = options.pop("stemmer")
+            if stemmer is None:
+                tokenizer.pop("stemmer", None)
+            else:
+                tokenizer["stemmer"] = stemmer
+
+        return {"fast": True, "tokenizer": tokenizer, **options}
+
+    def get_key_field(self, model):
+        if self._key_field:
+            return model._meta.get_field(self._key_field)
+        return model._meta.pk
+
+    def get_text_fields(self, model, connection):
+        return [
+            name
+            for name in self.fields
+            if self.get_field_type(model._meta.get_field(name), connection)
+            == "text_fields"
+        ]
+
     def create_sql(self, model, schema_editor, using="", **kwargs):
         self.check_supported(schema_editor)
-        if self._key_field:
-            _id_field_name = self._key_field
-        else:
-            _id_field_name = model.pk.fget(model).field.name
+        _id_field_name = self.get_key_field(model).name
 
         if (_id_field_name, "") not in self.fields_orders:
             self.fields_orders.insert(0, (_id_field_name, ""))
@@ -28,25 +156,87 @@ class BM25Index(PostgresIndex):
             model, schema_editor, using=" %s " % (using or self.suffix), **kwargs
         )
 
-        text_fields = {}
-
+        configs = {}
         for f in model._meta.fields:
-            name, db_type = f.name, f.db_type(schema_editor.connection)
-            if name in self.fields and (
-                db_type == "text" or db_type.startswith("varchar")
-            ):
-                text_fields[name] = {
-                    "fast": True,
-                    "tokenizer": self._get_tokenizer(),
-                }
-
-        statement.parts["extra"] = " WITH (key_field='%s', text_fields='%s')" % (
-            _id_field_name,
-            json.dumps(text_fields),
-        )
+            if f.name not in self.fields:
+                continue
+            field_type = self.get_field_type(f, schema_editor.connection)
+            if field_type is not None:
+                configs.setdefault(field_type, {})[f.column] = self.get_field_config(
+                    f, field_type
+                )
+
+        options = ["key_field='%s'" % _id_field_name]
+        for field_type, config in configs.items():
+            options.append(
+                "%s='%s'" % (field_type, json.dumps(config).replace("'", "''"))
+            )
+        statement.parts["extra"] = " WITH (%s)" % ", ".join(options)
         return statement
 
 
 class BM25NgramIndex(BM25Index):
-    def _get_tokenizer(self):
-        return {"type": "ngram", "min_gram": 2, "max_gram": 3, "prefix_only": False}
+    """
+    A BM25Index tokenizing text fields into n-grams of ``min_gram`` to
+    ``max_gram`` characters, or into edge n-grams (the prefixes of each
+    token) with ``prefix_only=True``. The n-gram options can be overridden
+    per field, e.g. for typeahead on the name only:
+
+    BM25NgramIndex(
+        fields=["name", "description"],
+        name="item_ngram_idx",
+        min_gram=2,
+        max_gram=3,
+        field_options={"name": {"min_gram": 1, "max_gram": 12, "prefix_only": True}},
+    )
+    """
+
+    def __init__(self, *expressions, **kwargs):
+        self._ngram = {
+            "min_gram": kwargs.pop("min_gram", 2),
+            "max_gram": kwargs.pop("max_gram", 3),
+            "prefix_only": kwargs.pop("prefix_only", False),
+        }
+        super().__init__(*expressions, **kwargs)
+
+        for name, options in [(None, {}), *self._field_options.items()]:
+            ngram = {**self._ngram, **options}
+            if not 1 <= ngram["min_gram"] <= ngram["max_gram"]:
+                raise ValueError(
+                    "BM25NgramIndex: min_gram must be between 1 and max_gram "
+                    "(got %d and %d%s)."
+                    % (
+                        ngram["min_gram"],
+                        ngram["max_gram"],
+                        " for %s" % name if name else "",
+                    )
+                )
+
+    def deconstruct(self):
+        path, args, kwargs = super().deconstruct()
+        for option, default in (
+            ("min_gram", 2),
+            ("max_gram", 3),
+            ("prefix_only", False),
+        ):
+            if self._ngram[option] != default:
+                kwargs[option] = self._ngram[option]
+        return path, args, kwargs
+
+    def _get_tokenizer(self, options):
+        tokenizer = {"type": "ngram", **self._ngram}
+        for option in NGRAM_OPTIONS:
+            if option in options:
+                tokenizer[option] = options.pop(option)
+        return tokenizer
+
+
+def get_bm25_index(model):
+    """
+    The BM25Index declared on the model, or None. ParadeDB supports a single
+    BM25 index per table.
+    """
+    for index in model._meta.indexes:
+        if isinstance(index, BM25Index):
+            return index
+    return None
@@ -0,0 +1,228 @@
+import json
+import logging
+import random
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import Signal
+
+
+logger = logging.getLogger("paradedb")
+
+# Sent after each tagged search query, with the SearchExecution as
+# ``execution``.
+search_executed = Signal()
+
+TAG_RE = re.compile(r"/\* paradedb:([\w,]+):([\w,]*) \*/")
+
+# Set within tagging(), to tag the SQL of all the connections.
+_tagging = ContextVar("paradedb_tagging", default=False)
+
+
+@contextmanager
+def tagging():
+    """
+    Have ParadeDB lookups and expressions tag their SQL within the block,
+    e.g. to find the indexes a queryset searches with get_tags().
+    """
+    token = _tagging.set(True)
+    try:
+        yield
+    finally:
+        _tagging.reset(token)
+
+
+def tag_sql(sql, lookups, indexes, connection):
+    """
+    Tag the SQL of a ParadeDB lookup or expression with a comment naming the
+    lookup and the index, for the execute wrappers to find. The SQL is only
+    tagged when an ExecuteWrapper is installed on the connection, or within
+    tagging(), so that it's left unchanged otherwise.
+    """
+    if not _tagging.get() and not any(
+        isinstance(wrapper, ExecuteWrapper) for wrapper in connection.execute_wrappers
+    ):
+        return sql
+    return "%s /* paradedb:%s:%s */" % (
+        sql,
+        ",".join(lookups),
+        ",".join(index for index in indexes if index),
+    )
+
+
+def get_tags(sql):
+    """
+    The lookup and index names the SQL is tagged with, in order of first
+    appearance.
+    """
+    lookups, indexes = {}, {}
+    for match in TAG_RE.finditer(sql):
+        lookups.update(dict.fromkeys(match[1].split(",")))
+        indexes.update(dict.fromkeys(filter(None, match[2].split(","))))
+    return list(lookups), list(indexes)
+
+
+class SearchExecution:
+    def __init__(self, sql, params, lookups, indexes, using):
+        self.sql = sql
+        self.params = params
+        self.lookups = lookups
+        self.indexes = indexes
+        self.using = using
+        self.duration = None
+        self.rows = None
+        self.error = None
+        self.plan = None
+
+    def __repr__(self):
+        return "<SearchExecution: %s on %s, %.1fms, %s rows>" % (
+            ", ".join(self.lookups),
+            ", ".join(self.indexes) or "-",
+            1000 * (self.duration or 0),
+            self.rows,
+        )
+
+
+def explain(connection, sql, params, options="FORMAT JSON"):
+    """
+    The EXPLAIN of a query, or None if it failed. The driver's cursor is
+    used, so that the EXPLAIN doesn't go through the execute wrappers, and a
+    savepoint keeps a failure from aborting the current transaction.
+    """
+    savepoint = not connection.get_autocommit()
+    with connection.connection.cursor() as cursor:
+        try:
+            if savepoint:
+                cursor.execute("SAVEPOINT paradedb_explain")
+            cursor.execute("EXPLAIN (%s) %s" % (options, sql), params)
+            plan = cursor.fetchone()[0]
+            if savepoint:
+                cursor.execute("RELEASE SAVEPOINT paradedb_explain")
+        except Exception:
+            logger.exception("Could not explain the search")
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT paradedb_explain")
+            return None
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan
+
+
+class ExecuteWrapper:
+    """
+    Base class of the execute wrappers that can be installed on all the
+    database connections. ParadeDB lookups tag their SQL on the connections
+    an ExecuteWrapper is installed on, with install() or
+    connection.execute_wrapper(), and only as long as it's installed.
+    """
+
+    def _connection_created(self, sender, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def install(self):
+        """
+        Install the wrapper on all the current and future database
+        connections.
+        """
+        for connection in connections.all(initialized_only=True):
+            self._connection_created(None, connection)
+        connection_created.connect(self._connection_created, weak=False)
+
+    def uninstall(self):
+        connection_created.disconnect(self._connection_created)
+        for connection in connections.all(initialized_only=True):
+            if self in connection.execute_wrappers:
+                connection.execute_wrappers.remove(self)
+
+
+class LoggingSink:
+    """
+    Logs each search to the ``paradedb`` logger, at the WARNING level when it
+    took ``slow_threshold`` seconds or more and at the DEBUG level otherwise.
+    """
+
+    def __init__(self, slow_threshold=0.5):
+        self.slow_threshold = slow_threshold
+
+    def record(self, execution):
+        slow = execution.duration >= self.slow_threshold
+        logger.log(
+            logging.WARNING if slow else logging.DEBUG,
+            "%s search on %s: %.1fms, %s rows%s",
+            ", ".join(execution.lookups),
+            ", ".join(execution.indexes) or "-",
+            1000 * execution.duration,
+            execution.rows,
+            "\n%s" % execution.plan if slow and execution.plan else "",
+        )
+
+
+class SearchInstrumentation(ExecuteWrapper):
+    """
+    A database execute wrapper recording the lookups and indexes, duration
+    and number of rows of each ParadeDB search. Each record (a
+    SearchExecution) is passed to the ``record()`` method of each sink and
+    sent with the ``search_executed`` signal.
+
+    A ``explain_rate`` fraction of the SELECT searches taking
+    ``slow_threshold`` seconds or more are run again with EXPLAIN (ANALYZE,
+    BUFFERS), the JSON plan being attached to the record as ``plan``.
+
+    Use it for a block of code:
+
+    with connection.execute_wrapper(SearchInstrumentation(sinks=[...])):
+        ...
+
+    or install it on all the connections, e.g. in AppConfig.ready():
+
+    SearchInstrumentation(sinks=[StatsdSink()], explain_rate=0.01).install()
+    """
+
+    def __init__(self, sinks=None, slow_threshold=0.5, explain_rate=0.0):
+        self.sinks = [LoggingSink(slow_threshold)] if sinks is None else sinks
+        self.slow_threshold = slow_threshold
+        self.explain_rate = explain_rate
+
+    def __call__(self, execute, sql, params, many, context):
+        lookups, indexes = get_tags(sql)
+        if not lookups:
+            return execute(sql, params, many, context)
+
+        connection = context["connection"]
+        execution = SearchExecution(sql, params, lookups, indexes, connection.alias)
+        start = time.perf_counter()
+        try:
+            result = execute(sql, params, many, context)
+        except Exception as e:
+            execution.error = e
+            raise
+        else:
+            rowcount = context["cursor"].rowcount
+            execution.rows = rowcount if rowcount >= 0 else None
+            return result
+        finally:
+            execution.duration = time.perf_counter() - start
+            if (
+                execution.error is None
+                and not many
+                and sql.lstrip()[:6].upper() == "SELECT"
+                and execution.duration >= self.slow_threshold
+                and random.random() < self.explain_rate
+            ):
+                execution.plan = explain(
+                    connection, sql, params, "ANALYZE, BUFFERS, FORMAT JSON"
+                )
+            self.record(execution)
+
+    def record(self, execution):
+        for sink in self.sinks:
+            try:
+                sink.record(execution)
+            except Exception:
+                logger.exception("Could not record the search in %r", sink)
+        search_executed.send(sender=self.__class__, execution=execution)
@@ -1,5 +1,65 @@
+from django.core.exceptions import EmptyResultSet, FullResultSet
 from django.db.models import Field
+from django.db.models.expressions import Col
 from django.db.models.lookups import PostgresOperatorLookup
+from django.db.models.sql.where import AND, OR, WhereNode
+
+from .indexes import get_bm25_index
+from .instrumentation import tag_sql
+
+
+class Relevance:
+    """
+    Wraps the right hand side of a ParadeDB lookup to bound its results by
+    relevance, to the rows scoring at least ``min_score`` and/or to the
+    ``top_k`` best scoring rows of the search.
+
+    ``min_score`` compares the score of each match of the search, next to
+    the ``@@@`` condition. ``top_k`` searches again in a subquery, whose
+    ORDER BY ... LIMIT reads the ``top_k`` best matches from the index,
+    before the queryset's other filters apply. The outer search is kept so
+    that Score, Highlight and the like still work on the results.
+
+    Item.objects.filter(description__term_search=Relevance("shoes", min_score=1.5))
+
+    SELECT description, rating, category
+    FROM mock_items
+    WHERE description @@@ 'shoes' AND paradedb.score(id) >= 1.5;
+
+    Item.objects.filter(description__term_search=Relevance("shoes", top_k=100))
+
+    SELECT description, rating, category
+    FROM mock_items
+    WHERE description @@@ 'shoes' AND id IN (
+        SELECT id FROM mock_items
+        WHERE description @@@ 'shoes'
+        ORDER BY paradedb.score(id) DESC
+        LIMIT 100
+    );
+    """
+
+    def __init__(self, value, min_score=None, top_k=None):
+        self.value = value
+        self.min_score = min_score
+        self.top_k = top_k
+
+    def __repr__(self):
+        return "Relevance(%r, min_score=%r, top_k=%r)" % (
+            self.value,
+            self.min_score,
+            self.top_k,
+        )
+
+
+def find_parent_node(node, lookup):
+    for child in node.children:
+        if child is lookup:
+            return node
+        if isinstance(child, WhereNode):
+            parent = find_parent_node(child, lookup)
+            if parent is not None:
+                return parent
+    return None
 
 
 @Field.register_lookup
@@ -11,14 +71,29 @@ class BaseParadeDBLookup(PostgresOperatorLookup):
     FROM mock_items
     WHERE description @@@ 'shoes'
     LIMIT 5;
+
+    Sibling ParadeDB lookups on the same table, e.g.
+    Q(name__term_search="shoes") | Q(description__term_search="shoes"), are
+    merged into a single boolean query against the key field, so that they
+    are answered by a single index scan:
+
+    SELECT description, rating, category
+    FROM mock_items
+    WHERE id @@@ paradedb.boolean(should => ARRAY[
+        paradedb.match(field => 'name', value => 'shoes'),
+        paradedb.match(field => 'description', value => 'shoes')
+    ]);
     """
 
     lookup_name = "term_search"
     postgres_operator = "@@@"
     prepare_rhs = True
+    relevance = None
 
     def get_prep_lookup(self):
-        rhs = super().get_prep_lookup()
+        if isinstance(self.rhs, Relevance):
+            self.relevance, self.rhs = self.rhs, self.rhs.value
+        rhs = self.search_value = super().get_prep_lookup()
         return (
             rhs.replace(":", r"\:")
             .replace("[", r"\[")
@@ -36,6 +111,126 @@ class BaseParadeDBLookup(PostgresOperatorLookup):
             .replace("}", r"\}")
         )
 
+    def process_key(self, compiler, connection, alias=None):
+        """
+        The SQL for the key field of the table the searched column
+        belongs to, i.e. the column paradedb.score() is computed on.
+        """
+        qn = connection.ops.quote_name
+        model = self.lhs.target.model
+        index = get_bm25_index(model)
+        key = index.get_key_field(model) if index else model._meta.pk
+        return f"{qn(alias or self.lhs.alias)}.{qn(key.column)}"
+
+    def get_index_name(self):
+        target = getattr(self.lhs, "target", None)
+        index = get_bm25_index(target.model) if target is not None else None
+        return index.name if index is not None else None
+
+    def tag(self, sql, lookups, connection):
+        return tag_sql(
+            sql,
+            [lookup.lookup_name for lookup in lookups],
+            [lookup.get_index_name() for lookup in lookups],
+            connection,
+        )
+
+    def as_paradedb_query(self, compiler, connection):
+        """
+        This lookup as a ParadeDB query builder function, to be matched
+        against the key field. paradedb.match() doesn't use the query
+        parser, so it takes the unescaped search value, while
+        paradedb.parse() takes the escaped one.
+        """
+        return "paradedb.match(field => %s, value => %s)", [
+            self.lhs.target.column,
+            self.search_value,
+        ]
+
+    def get_merge_group(self, compiler):
+        """
+        The connector and the sibling ParadeDB lookups (including this one)
+        on the same table this lookup is merged with, or None.
+        """
+        if self.relevance is not None or not isinstance(self.lhs, Col):
+            return None
+
+        for where in (
+            getattr(compiler, "where", None),
+            getattr(compiler, "having", None),
+            compiler.query.where,
+        ):
+            parent = where is not None and find_parent_node(where, self)
+            if parent:
+                break
+        else:
+            return None
+
+        if parent.connector not in (AND, OR):
+            return None
+        group = [
+            child
+            for child in parent.children
+            if isinstance(child, BaseParadeDBLookup)
+            and child.relevance is None
+            and isinstance(child.lhs, Col)
+            and child.lhs.alias == self.lhs.alias
+        ]
+        if len(group) < 2:
+            return None
+        return parent.connector, group
+
+    def as_merged_sql(self, compiler, connection, connector, lookups):
+        queries, params = [], []
+        for lookup in lookups:
+            query_sql, query_params = lookup.as_paradedb_query(compiler, connection)
+            queries.append(query_sql)
+            params.extend(query_params)
+        occur = "should" if connector == OR else "must"
+        return (
+            f"{self.process_key(compiler, connection)} @@@ paradedb.boolean("
+            f"{occur} => ARRAY[{', '.join(queries)}])"
+        ), params
+
+    def as_postgresql(self, compiler, connection):
+        group = self.get_merge_group(compiler)
+        if group is not None:
+            connector, lookups = group
+            if self is lookups[0]:
+                sql, params = self.as_merged_sql(
+                    compiler, connection, connector, lookups
+                )
+                return self.tag(sql, lookups, connection), params
+            # Already part of the merged query: neutral in its parent node.
+            raise FullResultSet if connector == AND else EmptyResultSet
+
+        sql, params = super().as_postgresql(compiler, connection)
+        if self.relevance is None:
+            return self.tag(sql, [self], connection), params
+
+        params = list(params)
+        key = self.process_key(compiler, connection)
+        if self.relevance.min_score is not None:
+            sql = f"{sql} AND paradedb.score({key}) >= %s::real"
+            params.append(self.relevance.min_score)
+
+        if self.relevance.top_k is not None:
+            qn = connection.ops.quote_name
+            alias = "paradedb_top_k"
+            inner = self.relabeled_clone({self.lhs.alias: alias})
+            inner.relevance = None
+            inner_sql, inner_params = inner.as_postgresql(compiler, connection)
+            inner_key = self.process_key(compiler, connection, alias=alias)
+            table = qn(self.lhs.target.model._meta.db_table)
+            sql = (
+                f"{sql} AND {key} IN (SELECT {inner_key} FROM {table} {qn(alias)} "
+                f"WHERE {inner_sql} ORDER BY paradedb.score({inner_key}) DESC "
+                "LIMIT %s)"
+            )
+            params.extend(inner_params)
+            params.append(self.relevance.top_k)
+        return self.tag(f"({sql})", [self], connection), params
+
 
 @Field.register_lookup
 class PhraseParadeDBLookup(BaseParadeDBLookup):
@@ -53,6 +248,9 @@ class PhraseParadeDBLookup(BaseParadeDBLookup):
         rhs, rhs_params = super().process_rhs(compiler, connection)
         return f"'\"{rhs_params[0]}\"'", []
 
+    def as_paradedb_query(self, compiler, connection):
+        return "paradedb.parse(%s)", [f'{self.lhs.target.column}:"{self.rhs}"']
+
 
 @Field.register_lookup
 class PhrasePrefixParadeDBLookup(BaseParadeDBLookup):
@@ -74,6 +272,9 @@ class PhrasePrefixParadeDBLookup(BaseParadeDBLookup):
         rhs, rhs_params = super().process_rhs(compiler, connection)
         return f"'\"{rhs_params[0]}\"*'", []
 
+    def as_paradedb_query(self, compiler, connection):
+        return "paradedb.parse(%s)", [f'{self.lhs.target.column}:"{self.rhs}"*']
+
 
 class BaseFuzzyParadeDBLookup(BaseParadeDBLookup):
     """
@@ -89,35 +290,32 @@ class BaseFuzzyParadeDBLookup(BaseParadeDBLookup):
     """
 
     def process_lhs(self, compiler, connection, lhs=None):
-        id_field_name = compiler.query.model._meta.pk.name
-
-        # This is so horribly awkward and brittle,
-        # there must be a proper way of doing this
-        lhs, _ = super().process_lhs(compiler, connection, lhs=lhs)
-        tbl = lhs.replace('"', "").rsplit(".", 1)[0]
-
-        return f'"{tbl}"."{id_field_name}"', []
+        return self.process_key(compiler, connection), []
 
     def process_rhs(self, compiler, connection):
-        rhs, rhs_params = super().process_rhs(compiler, connection)
-        lhs, _ = super().process_lhs(compiler, connection)
-        col = lhs.replace('"', "").rsplit(".", 1)[-1]
+        return self.as_paradedb_query(compiler, connection)
+
+    def as_paradedb_query(self, compiler, connection):
         return (
-            "paradedb.match(field => %s, value => %s, "
-            f"conjunction_mode => {self.match_all_terms}, "
-            f"distance => {self.distance})"
-        ), [col, rhs_params[0]]
+            "paradedb.match(field => %s, value => %s, conjunction_mode => %s, "
+            "distance => %s)"
+        ), [
+            self.lhs.target.column,
+            self.search_value,
+            self.match_all_terms,
+            self.distance,
+        ]
 
 
 @Field.register_lookup
 class FuzzyParadeDBLookup(BaseFuzzyParadeDBLookup):
     lookup_name = "fuzzy_term_search"
-    match_all_terms = "false"
+    match_all_terms = False
     distance = 2
 
 
 @Field.register_lookup
 class FuzzyPhraseParadeDBLookup(BaseFuzzyParadeDBLookup):
     lookup_name = "fuzzy_phrase_search"
-    match_all_terms = "true"
+    match_all_terms = True
     distance = 2
@@ -0,0 +1,193 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from ...indexes import get_bm25_index
+from ...progress import IndexBuildProgress
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the BM25 indexes declared on installed models, e.g. after a "
+        "bulk load, reporting the build progress, time and final index size."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "indexes",
+            nargs="*",
+            metavar="index_name",
+            help="Only rebuild these indexes (default: all BM25 indexes).",
+        )
+        parser.add_argument(
+            "--model",
+            action="append",
+            default=[],
+            metavar="app_label.ModelName",
+            help="Only rebuild the BM25 index of this model (can be repeated).",
+        )
+        parser.add_argument(
+            "--list",
+            action="store_true",
+            default=False,
+            help="List the BM25 indexes and their size, without rebuilding them.",
+        )
+        parser.add_argument(
+            "--concurrently",
+            action="store_true",
+            default=False,
+            help="Use REINDEX CONCURRENTLY, so that writes aren't blocked.",
+        )
+        parser.add_argument(
+            "--maintenance-work-mem",
+            help="The maintenance_work_mem to build the indexes with, e.g. 4GB.",
+        )
+        parser.add_argument(
+            "--parallel-workers",
+            type=int,
+            help="The max_parallel_maintenance_workers to build the indexes with.",
+        )
+        parser.add_argument(
+            "--set",
+            action="append",
+            default=[],
+            metavar="NAME=VALUE",
+            help="Set any other setting for the session, e.g. "
+            "paradedb.create_index_parallelism=8 (can be repeated).",
+        )
+        parser.add_argument(
+            "--progress-interval",
+            type=float,
+            default=5.0,
+            help="Seconds between progress reports, 0 to disable (default: 5).",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help='The database to rebuild the indexes on (default: "default").',
+        )
+
+    def get_indexes(self, names, model_labels):
+        if model_labels:
+            try:
+                models = [apps.get_model(label) for label in model_labels]
+            except (LookupError, ValueError) as e:
+                raise CommandError(e)
+        else:
+            models = apps.get_models()
+
+        indexes = []
+        for model in models:
+            index = get_bm25_index(model)
+            if index is None:
+                if model_labels:
+                    raise CommandError("%s has no BM25 index." % model._meta.label)
+                continue
+            if not names or index.name in names:
+                indexes.append((model, index))
+
+        missing = set(names) - {index.name for _, index in indexes}
+        if missing:
+            raise CommandError(
+                "Unknown BM25 index(es): %s." % ", ".join(sorted(missing))
+            )
+        return indexes
+
+    def get_settings(self, options):
+        settings = {}
+        if options["maintenance_work_mem"]:
+            settings["maintenance_work_mem"] = options["maintenance_work_mem"]
+        if options["parallel_workers"] is not None:
+            settings["max_parallel_maintenance_workers"] = str(
+                options["parallel_workers"]
+            )
+        for setting in options["set"]:
+            name, sep, value = setting.partition("=")
+            if not sep or not name.strip():
+                raise CommandError("Invalid --set %r, use NAME=VALUE." % setting)
+            settings[name.strip()] = value.strip()
+        return settings
+
+    def index_size(self, cursor, index):
+        cursor.execute(
+            "SELECT pg_size_pretty(pg_relation_size(%s::regclass))",
+            [cursor.db.ops.quote_name(index.name)],
+        )
+        return cursor.fetchone()[0]
+
+    def report_progress(self, index):
+        def report(progress):
+            done = (
+                "%.1f%%" % progress["percent"]
+                if progress["percent"] is not None
+                else "%d tuples" % progress["tuples_done"]
+            )
+            self.stdout.write("  %s: %s (%s)" % (index.name, progress["phase"], done))
+
+        return report
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        connection = connections[using]
+        indexes = self.get_indexes(options["indexes"], options["model"])
+        if not indexes:
+            self.stdout.write("No BM25 indexes found.")
+            return
+
+        if options["list"]:
+            with connection.cursor() as cursor:
+                for model, index in indexes:
+                    self.stdout.write(
+                        "%s on %s (%s)"
+                        % (
+                            index.name,
+                            model._meta.label,
+                            self.index_size(cursor, index),
+                        )
+                    )
+            return
+
+        settings = self.get_settings(options)
+        reindex = "REINDEX INDEX %s"
+        if options["concurrently"]:
+            reindex = "REINDEX INDEX CONCURRENTLY %s"
+        with connection.cursor() as cursor:
+            try:
+                for name, value in settings.items():
+                    cursor.execute("SELECT set_config(%s, %s, false)", [name, value])
+                    self.stdout.write("Set %s = %s" % (name, value))
+
+                for model, index in indexes:
+                    self.stdout.write(
+                        "Rebuilding %s on %s..." % (index.name, model._meta.label)
+                    )
+                    start = time.monotonic()
+                    with IndexBuildProgress(
+                        using,
+                        model._meta.db_table,
+                        callback=self.report_progress(index),
+                        interval=options["progress_interval"],
+                    ):
+                        try:
+                            cursor.execute(
+                                reindex % connection.ops.quote_name(index.name)
+                            )
+                        except DatabaseError as e:
+                            raise CommandError(
+                                "Could not rebuild %s: %s" % (index.name, e)
+                            )
+                    self.stdout.write(
+                        self.style.SUCCESS(
+                            "Rebuilt %s in %.1fs (%s)"
+                            % (
+                                index.name,
+                                time.monotonic() - start,
+                                self.index_size(cursor, index),
+                            )
+                        )
+                    )
+            finally:
+                for name in settings:
+                    cursor.execute("SELECT set_config(%s, NULL, false)", [name])
@@ -0,0 +1,91 @@
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    RemoveIndexConcurrently,
+)
+
+from .indexes import BM25Index
+from .progress import IndexBuildProgress
+
+
+class AddBM25IndexConcurrently(AddIndexConcurrently):
+    """
+    Create a BM25 index using CREATE INDEX CONCURRENTLY, so that writes to
+    the table aren't blocked for the duration of the build. The build
+    progress is logged to the ``paradedb`` logger every
+    ``progress_interval`` seconds (set it to 0 to disable).
+
+    As with AddIndexConcurrently, the migration must be non-atomic:
+
+    class Migration(migrations.Migration):
+        atomic = False
+
+        operations = [
+            AddBM25IndexConcurrently(
+                model_name="item",
+                index=BM25Index(fields=["name", "description"], name="item_idx"),
+            ),
+        ]
+    """
+
+    def __init__(self, model_name, index, progress_interval=10.0):
+        if not isinstance(index, BM25Index):
+            raise ValueError(
+                "%s requires a BM25Index, got %r." % (self.__class__.__name__, index)
+            )
+        self.progress_interval = progress_interval
+        super().__init__(model_name, index)
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        if self.progress_interval != 10.0:
+            kwargs["progress_interval"] = self.progress_interval
+        return name, args, kwargs
+
+    def describe(self):
+        return "Concurrently create BM25 index %s on field(s) %s of model %s" % (
+            self.index.name,
+            ", ".join(self.index.fields),
+            self.model_name,
+        )
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        with IndexBuildProgress(
+            schema_editor.connection.alias,
+            model._meta.db_table,
+            interval=self.progress_interval,
+        ):
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+
+class RemoveBM25IndexConcurrently(RemoveIndexConcurrently):
+    """
+    Remove a BM25 index using DROP INDEX CONCURRENTLY. Reverting the
+    operation rebuilds the index concurrently, reporting its progress as
+    AddBM25IndexConcurrently does.
+    """
+
+    def __init__(self, model_name, name, progress_interval=10.0):
+        self.progress_interval = progress_interval
+        super().__init__(model_name, name)
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        if self.progress_interval != 10.0:
+            kwargs["progress_interval"] = self.progress_interval
+        return name, args, kwargs
+
+    def describe(self):
+        return "Concurrently remove BM25 index %s from %s" % (
+            self.name,
+            self.model_name,
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        with IndexBuildProgress(
+            schema_editor.connection.alias,
+            model._meta.db_table,
+            interval=self.progress_interval,
+        ):
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
@@ -0,0 +1,224 @@
+import base64
+import json
+
+from asgiref.sync import sync_to_async
+
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Count, FloatField, Q, Window
+from django.db.models.expressions import RawSQL
+from django.utils.functional import cached_property
+
+from .functions import Score
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor, paginator):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.paginator = paginator
+
+    def __repr__(self):
+        return "<KeysetPage of %d results>" % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Paginates a ParadeDB search queryset by relevance, using an opaque
+    ``(score, pk)`` cursor instead of an OFFSET, so that every page is a
+    single top-N query against the BM25 index:
+
+    SELECT ..., paradedb.score(id) AS score
+    FROM mock_items
+    WHERE description @@@ 'shoes'
+      AND (paradedb.score(id) < 1.23
+           OR (paradedb.score(id) = 1.23 AND id > 42))
+    ORDER BY score DESC, id ASC
+    LIMIT 21;
+    """
+
+    def __init__(self, object_list, per_page, score=None, score_name="score"):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.score = score if score is not None else Score()
+        self.score_name = score_name
+
+    def encode_cursor(self, score, pk):
+        payload = json.dumps([score, pk], default=str).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            score, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return float(score), pk
+        except (TypeError, ValueError):
+            raise InvalidCursor("The cursor %r is invalid" % cursor)
+
+    def get_queryset(self, cursor=None):
+        qs = self.object_list.annotate(**{self.score_name: self.score}).order_by(
+            f"-{self.score_name}", "pk"
+        )
+        if cursor:
+            score, pk = self.decode_cursor(cursor)
+            # paradedb.score() is a float4: compare against the cursor value
+            # as a float4 as well, or the equality branch would never match.
+            score = RawSQL("%s::real", (score,), output_field=FloatField())
+            qs = qs.filter(
+                Q(**{f"{self.score_name}__lt": score})
+                | Q(**{self.score_name: score, "pk__gt": pk})
+            )
+        return qs
+
+    def page(self, cursor=None):
+        """
+        Return a KeysetPage of results following the given cursor (or the
+        first page when no cursor is given).
+        """
+        object_list = list(self.get_queryset(cursor)[: self.per_page + 1])
+        next_cursor = None
+        if len(object_list) > self.per_page:
+            object_list = object_list[: self.per_page]
+            last = object_list[-1]
+            next_cursor = self.encode_cursor(getattr(last, self.score_name), last.pk)
+        return KeysetPage(object_list, next_cursor, self)
+
+    async def apage(self, cursor=None):
+        return await sync_to_async(self.page)(cursor)
+
+
+class SearchPaginator(Paginator):
+    """
+    A Paginator for ParadeDB search querysets, that avoids running the whole
+    search again just to count the matches. ``count_mode`` is one of:
+
+    - ``"capped"`` (default): count up to ``max_count`` matches, e.g. to
+      display "10,000+ results" (``count_is_capped`` is then True).
+    - ``"estimate"``: use the planner's estimate of the number of matches,
+      from an EXPLAIN (``count_is_estimate`` is True).
+    - ``"window"``: fetch the exact count along with the rows of the page,
+      with COUNT(*) OVER (), in a single round trip.
+    - ``"exact"``: count all the matches, as Paginator does.
+
+    paginator = SearchPaginator(
+        Item.objects.filter(description__term_search="music")
+        .annotate(score=Score())
+        .order_by("-score"),
+        per_page=20,
+        count_mode="capped",
+        max_count=10_000,
+    )
+    page = paginator.page(1)
+    paginator.display_count  # "10,000+"
+
+    Pages beyond a capped or estimated count can't be reached, but the last
+    reachable page is complete: with ``max_count=10_000`` and
+    ``per_page=20``, page 500 has the 9,981st to 10,000th matches.
+    """
+
+    count_modes = ("capped", "estimate", "window", "exact")
+
+    def __init__(
+        self, object_list, per_page, count_mode="capped", max_count=10_000, **kwargs
+    ):
+        if count_mode not in self.count_modes:
+            raise ValueError(
+                "count_mode must be one of %s." % ", ".join(self.count_modes)
+            )
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_mode = count_mode
+        self.max_count = max_count
+        self.count_is_capped = False
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list.order_by()
+        if self.count_mode == "estimate":
+            plan = json.loads(queryset.explain(format="json"))
+            if isinstance(plan, list):
+                plan = plan[0]
+            self.count_is_estimate = True
+            return int(plan["Plan"]["Plan Rows"])
+        if self.count_mode == "exact":
+            return queryset.count()
+
+        count = queryset[: self.max_count + 1].count()
+        if count > self.max_count:
+            self.count_is_capped = True
+            return self.max_count
+        return count
+
+    @property
+    def display_count(self):
+        if self.count_is_capped:
+            return "{:,}+".format(self.count)
+        if self.count_is_estimate:
+            return "~{:,}".format(self.count)
+        return "{:,}".format(self.count)
+
+    def page(self, number):
+        if self.count_mode == "window" and "count" not in self.__dict__:
+            try:
+                number = int(number)
+            except (TypeError, ValueError):
+                pass
+            else:
+                if number >= 1:
+                    return self.get_window_page(number)
+
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        # A capped or estimated count isn't the end of the results: only
+        # an exact one truncates the last page (or extends it with orphans).
+        if (
+            not self.count_is_capped
+            and not self.count_is_estimate
+            and top + self.orphans >= self.count
+        ):
+            top = self.count
+        return self._get_page(self.object_list[bottom:top], number, self)
+
+    def get_window_page(self, number):
+        # Fetch the orphans the last page may include along with the rows.
+        bottom = (number - 1) * self.per_page
+        rows = list(
+            self.object_list.annotate(paradedb_total=Window(Count("*")))[
+                bottom : bottom + self.per_page + self.orphans
+            ]
+        )
+        if rows:
+            row = rows[0]
+            if isinstance(row, dict):
+                self.__dict__["count"] = row["paradedb_total"]
+            elif isinstance(row, tuple):
+                self.__dict__["count"] = row[-1]
+            else:
+                self.__dict__["count"] = row.paradedb_total
+        else:
+            # Past the last page: count the matches to validate the number.
+            self.__dict__["count"] = self.object_list.order_by().count()
+        number = self.validate_number(number)
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        return self._get_page(rows[: top - bottom], number, self)
+
+    async def apage(self, number):
+        return await sync_to_async(self.page)(number)
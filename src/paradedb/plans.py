@@ -0,0 +1,156 @@
+import json
+import logging
+import random
+import warnings
+
+from django.apps import apps
+
+from .indexes import get_bm25_index
+from .instrumentation import ExecuteWrapper, explain, get_tags, tagging
+
+
+logger = logging.getLogger("paradedb")
+
+INDEX_SCANS = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+
+class SearchPlanWarning(RuntimeWarning):
+    pass
+
+
+class SearchPlanError(Exception):
+    pass
+
+
+def iter_nodes(plan):
+    if isinstance(plan, list):
+        plan = plan[0]
+    if "Plan" in plan:
+        plan = plan["Plan"]
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from iter_nodes(child)
+
+
+def get_index_tables():
+    tables = {}
+    for model in apps.get_models():
+        index = get_bm25_index(model)
+        if index is not None:
+            tables[index.name] = model._meta.db_table
+    return tables
+
+
+def check_plan(plan, indexes):
+    """
+    The problems of a JSON query plan of a search on the given BM25 indexes:
+    each index must be used by a ParadeDB custom scan or an index scan, and
+    no ``@@@`` condition may be applied as a mere filter.
+    """
+    tables = get_index_tables()
+    used, problems = set(), []
+    for node in iter_nodes(plan):
+        node_type = node.get("Node Type")
+        index = node.get("Index Name") or node.get("Index")
+        if node_type == "Custom Scan" and "ParadeDB" in node.get(
+            "Custom Plan Provider", ""
+        ):
+            if index:
+                used.add(index)
+            else:
+                used.update(
+                    name
+                    for name, table in tables.items()
+                    if table == node.get("Relation Name")
+                )
+        elif node_type in INDEX_SCANS and index:
+            used.add(index)
+        for condition in ("Filter", "Join Filter"):
+            if "@@@" in node.get(condition, ""):
+                problems.append(
+                    "%s on %s applies a search as a filter: %s"
+                    % (node_type, node.get("Relation Name", "-"), node[condition])
+                )
+    for index in indexes:
+        if index not in used:
+            problems.append("The %s index isn't scanned." % index)
+    return problems
+
+
+def explain_search(queryset):
+    """
+    The BM25 indexes a queryset searches and its JSON query plan.
+    """
+    with tagging():
+        sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    _, indexes = get_tags(sql)
+    plan = json.loads(queryset.explain(format="json"))
+    return indexes, plan
+
+
+def assert_uses_bm25_index(queryset):
+    """
+    Raise an AssertionError when the query plan of a search queryset doesn't
+    scan the BM25 index of each ParadeDB lookup, e.g. in a test:
+
+    assert_uses_bm25_index(
+        Review.objects.filter(item__description__term_search="shoes")
+    )
+    """
+    indexes, plan = explain_search(queryset)
+    problems = check_plan(plan, indexes)
+    if not indexes:
+        problems.append("The queryset doesn't search any BM25 index.")
+    if problems:
+        raise AssertionError(
+            "\n".join(problems) + "\n\nQuery plan:\n" + json.dumps(plan, indent=2)
+        )
+
+
+class PlanGuard(ExecuteWrapper):
+    """
+    A database execute wrapper checking the query plan of ParadeDB searches
+    (or of a ``rate`` fraction of them) before running them, and warning
+    with a SearchPlanWarning (``action="warn"``), raising a SearchPlanError
+    (``action="raise"``) or logging to the ``paradedb`` logger
+    (``action="log"``) when a BM25 index isn't scanned:
+
+    with connection.execute_wrapper(PlanGuard(action="raise")):
+        ...
+
+    PlanGuard(action="warn", rate=0.1).install()
+
+    Running EXPLAIN adds a round trip, which makes it best suited for
+    development, CI and canary deployments.
+    """
+
+    def __init__(self, action="warn", rate=1.0):
+        if action not in ("warn", "raise", "log"):
+            raise ValueError("action must be one of warn, raise or log.")
+        self.action = action
+        self.rate = rate
+
+    def __call__(self, execute, sql, params, many, context):
+        _, indexes = get_tags(sql)
+        if (
+            indexes
+            and not many
+            and sql.lstrip()[:6].upper() == "SELECT"
+            and random.random() < self.rate
+        ):
+            self.check(context["connection"], sql, params, indexes)
+        return execute(sql, params, many, context)
+
+    def check(self, connection, sql, params, indexes):
+        plan = explain(connection, sql, params)
+        problems = check_plan(plan, indexes) if plan is not None else []
+        if not problems:
+            return
+
+        message = "Inefficient search plan: %s\n%s" % (" ".join(problems), sql)
+        if self.action == "raise":
+            raise SearchPlanError(message)
+        if self.action == "warn":
+            warnings.warn(message, SearchPlanWarning, stacklevel=2)
+        else:
+            logger.warning(message)
@@ -0,0 +1,95 @@
+import logging
+import threading
+
+from django.db import connections
+
+
+logger = logging.getLogger("paradedb")
+
+
+class IndexBuildProgress:
+    """
+    Reports on the progress of an index build on a table, by polling
+    pg_stat_progress_create_index from a separate connection while the
+    build runs in the current one:
+
+    with IndexBuildProgress("default", "mock_items"):
+        cursor.execute("CREATE INDEX CONCURRENTLY ...")
+
+    Each report is passed to ``callback`` as a dict with the phase,
+    blocks/tuples done and total and the percentage done (when known), and
+    is logged to the ``paradedb`` logger by default.
+    """
+
+    query = """
+        SELECT command, phase, blocks_done, blocks_total, tuples_done, tuples_total
+        FROM pg_stat_progress_create_index
+        WHERE relid = %s::regclass
+    """
+
+    def __init__(self, using, table, callback=None, interval=10.0):
+        self.using = using
+        self.table = table
+        self.callback = callback or self.log
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        if self.interval:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def log(self, progress):
+        logger.info(
+            "%s on %s: %s (%s)",
+            progress["command"],
+            self.table,
+            progress["phase"],
+            "%.1f%%" % progress["percent"]
+            if progress["percent"] is not None
+            else "%d tuples" % progress["tuples_done"],
+        )
+
+    def poll(self, cursor):
+        cursor.execute(self.query, [cursor.db.ops.quote_name(self.table)])
+        row = cursor.fetchone()
+        if row is None:
+            return None
+
+        command, phase, blocks_done, blocks_total, tuples_done, tuples_total = row
+        percent = None
+        if tuples_total:
+            percent = 100.0 * tuples_done / tuples_total
+        elif blocks_total:
+            percent = 100.0 * blocks_done / blocks_total
+        return {
+            "command": command,
+            "phase": phase,
+            "blocks_done": blocks_done,
+            "blocks_total": blocks_total,
+            "tuples_done": tuples_done,
+            "tuples_total": tuples_total,
+            "percent": percent,
+        }
+
+    def _run(self):
+        # Django connections are thread local: this is a separate session
+        # from the one running the build.
+        connection = connections[self.using]
+        try:
+            while not self._stop.wait(self.interval):
+                with connection.cursor() as cursor:
+                    progress = self.poll(cursor)
+                if progress is not None:
+                    self.callback(progress)
+        except Exception:
+            logger.exception("Could not poll the progress of the index build")
+        finally:
+            connection.close()
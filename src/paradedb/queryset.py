@@ -0,0 +1,220 @@
+from django.db import models
+from django.db.models.query import ModelIterable
+
+from .cache import default_cache, invalidate
+from .functions import Fuzzy, Score, Search
+from .hybrid import hybrid_search
+
+
+class LateHighlightIterable(ModelIterable):
+    """
+    Computes the queryset's highlights in an outer query over the ids of the
+    requested page only, rather than for every row the search matches.
+    """
+
+    def __iter__(self):
+        queryset = self.queryset
+        outer = queryset._chain()
+        outer._iterable_class = ModelIterable
+        if queryset.query.is_sliced:
+            outer.query.clear_limits()
+            outer = outer.filter(pk__in=queryset.values("pk"))
+        outer = outer.annotate(**queryset._highlights)
+        yield from ModelIterable(outer, self.chunked_fetch, self.chunk_size)
+
+
+class TwoPhaseIterable(ModelIterable):
+    """
+    Fetches the primary keys and scores of the requested rows first, then
+    loads the rows themselves by primary key, in score order.
+    """
+
+    def __iter__(self):
+        queryset = self.queryset
+        score_name = queryset._two_phase_score
+        rows = queryset.prefetch_related(None).values_list("pk", score_name)
+        if queryset._search_cache is not None:
+            rows = queryset._search_cache.get_or_fetch(rows)
+        else:
+            rows = list(rows)
+        if not rows:
+            return
+
+        pks = [pk for pk, _ in rows]
+        if queryset._highlights:
+            # Snippets need the search predicate.
+            objects = queryset._chain()
+            objects._iterable_class = ModelIterable
+            objects.query.clear_limits()
+            objects.query.clear_ordering(force=True)
+            objects = objects.filter(pk__in=pks).annotate(**queryset._highlights)
+        else:
+            objects = queryset.model._base_manager.db_manager(queryset.db).filter(
+                pk__in=pks
+            )
+            objects.query.select_related = queryset.query.select_related
+            objects.query.deferred_loading = queryset.query.deferred_loading
+            objects = objects.prefetch_related(*queryset._prefetch_related_lookups)
+
+        objects = {obj.pk: obj for obj in objects}
+        for pk, score in rows:
+            obj = objects.get(pk)
+            if obj is not None:
+                setattr(obj, score_name, score)
+                yield obj
+
+
+class ParadeDBQuerySet(models.QuerySet):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._highlights = {}
+        self._two_phase_score = None
+        self._search_cache = None
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._highlights = dict(self._highlights)
+        clone._two_phase_score = self._two_phase_score
+        clone._search_cache = self._search_cache
+        return clone
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        invalidate(self.model, self.db)
+        return rows
+
+    update.alters_data = True
+
+    def bulk_create(self, *args, **kwargs):
+        objs = super().bulk_create(*args, **kwargs)
+        invalidate(self.model, self.db)
+        return objs
+
+    def bulk_update(self, *args, **kwargs):
+        rows = super().bulk_update(*args, **kwargs)
+        invalidate(self.model, self.db)
+        return rows
+
+    bulk_update.alters_data = True
+
+    def two_phase(self, score_name="score", score=None):
+        """
+        Evaluate the search in two phases: first fetch only the primary keys
+        and scores of the requested (typically top-K) rows, then load these
+        rows by primary key. The heap and network I/O then scale with the
+        size of the page instead of with the number of matches:
+
+        Book.objects.filter(description__term_search="music").two_phase()[:20]
+
+        SELECT id, paradedb.score(id) AS score FROM books
+        WHERE description @@@ 'music'
+        ORDER BY score DESC, id
+        LIMIT 20;
+
+        SELECT * FROM books WHERE id IN (...);
+
+        The results are annotated with the score (under ``score_name``) and
+        ordered by descending score, unless the queryset is explicitly
+        ordered. select_related(), prefetch_related(), only() and defer()
+        apply to the second query.
+        """
+        clone = self._chain()
+        if score_name not in clone.query.annotations:
+            clone = clone.annotate(**{score_name: score or Score()})
+        if not clone.query.order_by:
+            clone = clone.order_by(f"-{score_name}", "pk")
+        clone._two_phase_score = score_name
+        clone._iterable_class = TwoPhaseIterable
+        return clone
+
+    def cached(self, cache=None, score_name="score"):
+        """
+        Evaluate the search in two phases (see two_phase()), serving the
+        primary keys and scores of the first phase from a SearchCache, the
+        process wide ``paradedb.cache.default_cache`` by default:
+
+        Book.objects.filter(description__term_search="music").cached()[:20]
+
+        The cached results are invalidated when instances of the searched
+        models are saved or deleted, or updated through a ParadeDBQuerySet.
+        """
+        clone = self._chain() if self._two_phase_score else self.two_phase(score_name)
+        clone._search_cache = cache or default_cache
+        return clone
+
+    def adaptive_search(
+        self,
+        query,
+        fields=None,
+        min_hits=10,
+        distances=(1, 2),
+        boosts=None,
+        match_all_terms=False,
+        **fuzzy_options,
+    ):
+        """
+        Search the query exactly (see Search) and, while there are fewer than
+        ``min_hits`` matches, fuzzily with each of the given ``distances`` in
+        turn (see Fuzzy, which accepts ``fuzzy_options``), returning the first
+        queryset with enough matches, or the last one:
+
+        Item.objects.adaptive_search("runing shoes", fields=["name"])
+
+        Each attempt but the last counts up to ``min_hits`` matches, so that
+        the expensive fuzzy queries only run for queries that need them.
+        """
+        options = {
+            "fields": fields,
+            "boosts": boosts,
+            "match_all_terms": match_all_terms,
+        }
+        attempts = [Search(query, **options)] + [
+            Fuzzy(query, distance=distance, **options, **fuzzy_options)
+            for distance in distances
+        ]
+        for attempt in attempts[:-1]:
+            queryset = self.filter(attempt)
+            if queryset[:min_hits].count() >= min_hits:
+                return queryset
+        return self.filter(attempts[-1])
+
+    def hybrid_search(self, query, distance, **kwargs):
+        """
+        Rank the queryset by both a BM25 search and a vector distance, fused
+        in a single query (see paradedb.hybrid.hybrid_search):
+
+        Item.objects.filter(rating__gte=4).hybrid_search(
+            "running shoes", CosineDistance("embedding", embedding), limit=20
+        )
+        """
+        return hybrid_search(self, query, distance, **kwargs)
+
+    def highlight(self, **highlights):
+        """
+        Annotate the results with the given Highlight (or Snippets)
+        expressions, computed only for the rows actually returned:
+
+        Item.objects.filter(description__term_search="shoes")
+            .annotate(score=Score())
+            .order_by("-score")
+            .highlight(description_hl=Highlight("description"))[:20]
+
+        SELECT ..., paradedb.snippet(description) AS description_hl
+        FROM mock_items
+        WHERE description @@@ 'shoes' AND id IN (
+            SELECT id FROM mock_items
+            WHERE description @@@ 'shoes'
+            ORDER BY paradedb.score(id) DESC
+            LIMIT 20
+        )
+        ORDER BY paradedb.score(id) DESC;
+        """
+        clone = self._chain()
+        clone._highlights.update(highlights)
+        if clone._iterable_class is ModelIterable:
+            clone._iterable_class = LateHighlightIterable
+        return clone
+
+
+class ParadeDBManager(models.Manager.from_queryset(ParadeDBQuerySet)):
+    pass
@@ -0,0 +1,68 @@
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db.models import Model, OuterRef, QuerySet
+
+from .functions import MoreLikeThis, Score
+from .indexes import get_bm25_index
+
+
+def recommend(source, documents, limit=10, **options):
+    """
+    The ``limit`` documents most like each of the given documents (model
+    instances or their keys), among the instances of a model or of a
+    queryset, as a dict mapping each document's key to a list of instances
+    ranked by score, e.g. for a "related books" widget:
+
+    recommend(Book.objects.filter(language="en"), [1, 2, 3], limit=5)
+
+    The recommendations of all the documents are computed by a single query,
+    with a MoreLikeThis subquery (which accepts ``options``) per document:
+
+    SELECT id, ARRAY(
+        SELECT U0.id FROM books U0
+        WHERE (U0.id @@@ paradedb.more_like_this(document_id => books.id,
+            max_query_terms => 25) AND U0.id <> books.id)
+        ORDER BY paradedb.score(U0.id) DESC LIMIT 5
+    )
+    FROM books
+    WHERE id IN (1, 2, 3);
+
+    The recommended instances are then loaded by key, with a second query.
+    """
+    if not isinstance(source, QuerySet):
+        source = source._default_manager.all()
+    model = source.model
+    index = get_bm25_index(model)
+    if index is None:
+        raise ValueError("%s has no BM25 index to search." % model._meta.label)
+    key = index.get_key_field(model)
+    keys = [
+        getattr(document, key.attname)
+        if isinstance(document, Model)
+        else key.to_python(document)
+        for document in documents
+    ]
+    if not keys:
+        return {}
+
+    similar = ArraySubquery(
+        source.filter(MoreLikeThis(OuterRef(key.name), **options))
+        .annotate(paradedb_score=Score())
+        .order_by("-paradedb_score", key.name)
+        .values(key.name)[:limit]
+    )
+    manager = model._base_manager.db_manager(source.db)
+    rows = dict(
+        manager.filter(**{f"{key.name}__in": keys})
+        .order_by()
+        .values_list(key.name, similar)
+    )
+    objects = manager.in_bulk(
+        {pk for similar_keys in rows.values() for pk in similar_keys},
+        field_name=key.name,
+    )
+    return {
+        document_key: [
+            objects[pk] for pk in rows.get(document_key, []) if pk in objects
+        ]
+        for document_key in keys
+    }
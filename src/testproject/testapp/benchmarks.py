@@ -0,0 +1,158 @@
+import random
+import statistics
+import time
+
+from django.contrib.postgres.search import SearchQuery
+from django.db import DatabaseError, connections
+
+from paradedb.functions import Highlight, Score
+
+from .models import Book
+
+
+def tsvector(w, w2):
+    return Book.objects.filter(
+        vector_column=SearchQuery(f"('{w}' | '{w2}')", search_type="raw")
+    ).values_list("id", flat=True)[:100]
+
+
+def term_search(w, w2):
+    return Book.objects.filter(description__term_search=f"{w} {w2}").values_list(
+        "id", flat=True
+    )[:100]
+
+
+def phrase_search(w, w2):
+    return Book.objects.filter(description__phrase_search=f"{w} {w2}").values_list(
+        "id", flat=True
+    )[:100]
+
+
+def phrase_prefix_search(w, w2):
+    return Book.objects.filter(
+        description__phrase_prefix_search=f"{w} {w2[:3]}"
+    ).values_list("id", flat=True)[:100]
+
+
+def fuzzy_term_search(w, w2):
+    return Book.objects.filter(description__fuzzy_term_search=w).values_list(
+        "id", flat=True
+    )[:100]
+
+
+def fuzzy_phrase_search(w, w2):
+    return Book.objects.filter(
+        description__fuzzy_phrase_search=f"{w} {w2}"
+    ).values_list("id", flat=True)[:100]
+
+
+def score(w, w2):
+    return (
+        Book.objects.filter(description__term_search=f"{w} {w2}")
+        .annotate(score=Score())
+        .order_by("-score")
+        .values_list("id", "score")[:100]
+    )
+
+
+def highlight(w, w2):
+    return (
+        Book.objects.filter(description__term_search=f"{w} {w2}")
+        .annotate(score=Score(), hl=Highlight("description"))
+        .order_by("-score")
+        .values_list("id", "hl")[:10]
+    )
+
+
+# The benchmarked queries: each builds a queryset from two search terms.
+CASES = {
+    "tsvector": tsvector,
+    "term_search": term_search,
+    "phrase_search": phrase_search,
+    "phrase_prefix_search": phrase_prefix_search,
+    "fuzzy_term_search": fuzzy_term_search,
+    "fuzzy_phrase_search": fuzzy_phrase_search,
+    "score": score,
+    "highlight": highlight,
+}
+
+
+def get_terms(count=1000):
+    """
+    Random words of the indexed book descriptions, to search for.
+    """
+    terms = set()
+    while len(terms) < count:
+        for book in Book.objects.only("description").order_by("?")[:100]:
+            words = [
+                word
+                for word in book.description.lower().split()
+                if len(word) > 4 and word.isalpha()
+            ]
+            terms.update(random.sample(words, min(len(words), 50)))
+            if len(terms) >= count:
+                break
+    return list(terms)[:count]
+
+
+def run_query(case, w, w2, using="default"):
+    """
+    Build, compile and run the queryset of a case, returning the ORM time
+    (building and compiling the queryset) and the database time (execution
+    and fetch), in seconds.
+    """
+    start = time.perf_counter()
+    queryset = case(w, w2)
+    sql, params = queryset.query.get_compiler(using).as_sql()
+    compiled = time.perf_counter()
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        cursor.fetchall()
+    return compiled - start, time.perf_counter() - compiled
+
+
+def percentile(timings, percent):
+    if len(timings) < 2:
+        return timings[0] if timings else None
+    return statistics.quantiles(timings, n=100, method="inclusive")[percent - 1]
+
+
+def summarize(timings):
+    """
+    Latency statistics of a list of timings in seconds, in milliseconds.
+    """
+    if not timings:
+        return {}
+    return {
+        "mean_ms": 1000 * statistics.fmean(timings),
+        "p50_ms": 1000 * percentile(timings, 50),
+        "p95_ms": 1000 * percentile(timings, 95),
+        "p99_ms": 1000 * percentile(timings, 99),
+        "max_ms": 1000 * max(timings),
+    }
+
+
+def load_worker(case_names, terms, duration, seed, using="default"):
+    """
+    Run random queries of the given cases for ``duration`` seconds on a
+    connection of its own, returning the latencies of the successful queries
+    and the number of failed ones.
+    """
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    try:
+        while time.perf_counter() < deadline:
+            case = CASES[rng.choice(case_names)]
+            try:
+                orm_time, db_time = run_query(
+                    case, rng.choice(terms), rng.choice(terms), using
+                )
+            except DatabaseError:
+                errors += 1
+                connections[using].close_if_unusable_or_obsolete()
+            else:
+                latencies.append(orm_time + db_time)
+    finally:
+        connections.close_all()
+    return latencies, errors
@@ -1,10 +1,14 @@
-import random
+import json
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
 
+import django
 from django.contrib.postgres.search import SearchQuery
 from django.core.management.base import BaseCommand
-from django.db import connection
+from django.db import connection, connections
 
+from ...benchmarks import CASES, get_terms, load_worker, run_query, summarize
 from ...models import Book
 
 
@@ -16,6 +20,148 @@ class Command(BaseCommand):
         )
         parser.add_argument("--print-explains", action="store_true", default=False)
         parser.add_argument("--samples", action="store", type=int, default=3)
+        parser.add_argument(
+            "--suite",
+            action="store_true",
+            default=False,
+            help="Measure the latency of each lookup and function against the "
+            "current rows, instead of comparing TSVector and ParadeDB while "
+            "deleting rows.",
+        )
+        parser.add_argument(
+            "--case",
+            action="append",
+            choices=list(CASES),
+            help="Only run this case of the suite or load test (can be repeated).",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=10,
+            help="Queries to run before measuring each case of the suite.",
+        )
+        parser.add_argument(
+            "--load",
+            action="store_true",
+            default=False,
+            help="Run the cases concurrently, at each level of --concurrency, "
+            "and report the throughput, latency and error rate of each level.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            nargs="+",
+            default=[1, 2, 4, 8, 16, 32],
+            help="The numbers of concurrent workers of the load test "
+            "(default: 1 2 4 8 16 32).",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=30.0,
+            help="Seconds to run each level of the load test (default: 30).",
+        )
+        parser.add_argument(
+            "--processes",
+            action="store_true",
+            default=False,
+            help="Run the load test workers in processes rather than threads, "
+            "so that the client isn't limited by the GIL.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results of the suite or load test to this JSON file.",
+        )
+
+    def run_suite(self, rq, options):
+        queries_count = options["queries"]
+        results = {}
+        for name in options["case"] or CASES:
+            case = CASES[name]
+            for i in range(options["warmup"]):
+                run_query(case, rq[i % len(rq)], rq[(i + 7) % len(rq)])
+
+            orm_times, db_times, latencies = [], [], []
+            start = time.perf_counter()
+            for i in range(queries_count):
+                orm_time, db_time = run_query(
+                    case, rq[i % len(rq)], rq[(i + 11) % len(rq)]
+                )
+                orm_times.append(orm_time)
+                db_times.append(db_time)
+                latencies.append(orm_time + db_time)
+            elapsed = time.perf_counter() - start
+
+            results[name] = {
+                "queries": queries_count,
+                "qps": queries_count / elapsed,
+                "latency": summarize(latencies),
+                "orm": summarize(orm_times),
+                "db": summarize(db_times),
+            }
+            latency = results[name]["latency"]
+            self.stdout.write(
+                f"{name}: {results[name]['qps']:.1f} q/s, "
+                f"p50 {latency['p50_ms']:.2f}ms, p95 {latency['p95_ms']:.2f}ms, "
+                f"p99 {latency['p99_ms']:.2f}ms "
+                f"(ORM p50 {results[name]['orm']['p50_ms']:.2f}ms, "
+                f"DB p50 {results[name]['db']['p50_ms']:.2f}ms)"
+            )
+        return results
+
+    def run_load(self, rq, options):
+        case_names = options["case"] or list(CASES)
+        duration = options["duration"]
+        levels = []
+        for concurrency in options["concurrency"]:
+            if options["processes"]:
+                # Forked workers must not share the connection of this process.
+                connections.close_all()
+                executor = ProcessPoolExecutor(
+                    max_workers=concurrency, initializer=django.setup
+                )
+            else:
+                executor = ThreadPoolExecutor(max_workers=concurrency)
+            with executor:
+                futures = [
+                    executor.submit(load_worker, case_names, rq, duration, seed)
+                    for seed in range(concurrency)
+                ]
+                results = [future.result() for future in futures]
+
+            latencies = [latency for worker, _ in results for latency in worker]
+            errors = sum(worker_errors for _, worker_errors in results)
+            queries = len(latencies) + errors
+            level = {
+                "concurrency": concurrency,
+                "queries": queries,
+                "errors": errors,
+                "error_rate": errors / queries if queries else 0.0,
+                "qps": len(latencies) / duration,
+                "latency": summarize(latencies),
+            }
+            levels.append(level)
+            self.stdout.write(
+                f"{concurrency} workers: {level['qps']:.1f} q/s, "
+                f"p50 {level['latency'].get('p50_ms', 0):.2f}ms, "
+                f"p95 {level['latency'].get('p95_ms', 0):.2f}ms, "
+                f"p99 {level['latency'].get('p99_ms', 0):.2f}ms, "
+                f"errors {100 * level['error_rate']:.2f}%"
+            )
+
+        peak = max(levels, key=lambda level: level["qps"])
+        self.stdout.write(
+            f"Peak throughput: {peak['qps']:.1f} q/s with {peak['concurrency']} workers"
+        )
+        return levels
+
+    def get_pg_search_version(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT extversion FROM pg_extension WHERE extname = 'pg_search'"
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
 
     def handle(self, **options):
         print_sample_queries = options.get("print_sample_queries", False)
@@ -29,23 +175,28 @@ class Command(BaseCommand):
             )
             return
 
-        rq = set()
         print("Building request terms queue")
-        while len(rq) < 1000:
-            books = Book.objects.only("description").order_by("?")[:100]
-            try:
-                for book in books:
-                    for word in random.sample(book.description.lower().split(), 50):
-                        if len(word) > 4 and word.isalpha():
-                            rq.add(word)
-
-                    if len(rq) >= 1000:
-                        break
+        rq = get_terms()
 
-            except ValueError:
-                pass
-
-        rq = list(rq)[:1000]
+        if options["suite"] or options["load"]:
+            report = {
+                "date": datetime.now(timezone.utc).isoformat(),
+                "rows": row_count,
+                "django": django.get_version(),
+                "postgres": connection.pg_version,
+                "pg_search": self.get_pg_search_version(),
+            }
+            if options["suite"]:
+                print(f"Running the benchmark suite against {row_count} rows")
+                report["results"] = self.run_suite(rq, options)
+            if options["load"]:
+                print(f"Running the load test against {row_count} rows")
+                report["load"] = self.run_load(rq, options)
+            if options["output"]:
+                with open(options["output"], "w") as f:
+                    json.dump(report, f, indent=2)
+                print(f"Results written to {options['output']}")
+            return
 
         queries_count = options.get("queries")
 
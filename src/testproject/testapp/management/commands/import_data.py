@@ -1,17 +1,54 @@
-import fileinput
 import json
 import os
 
 import tqdm
 
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
 
-from ...models import Book
+from paradedb.bulk import copy_rows, parse_in_parallel
+
+from ...models import Book, BookReview
+
+
+def parse_book(line):
+    row = json.loads(line)
+    language_code = row.get("language_code")
+    if language_code.lower() not in ("eng", "en-gb", "en-us", "en-ca", "en-au"):
+        return None
+    return {
+        "title": row.get("title")[:255],
+        "isbn": row.get("isbn13", row.get("isbn", "")),
+        "average_rating": row.get("average_rating") or None,
+        "ratings_count": row.get("ratings_count", 0) or 0,
+        "description": row.get("description"),
+        "url": row.get("url", row.get("link", "")),
+        "image_url": row.get("image_url"),
+        "pages": row.get("num_pages") or None,
+        "publication_year": row.get("publication_year") or None,
+        "ext_id": row.get("book_id"),
+    }
 
 
 class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument("--path", type=str)
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=None,
+            help="The number of processes parsing the file (default: CPU count).",
+        )
+
+    def read_lines(self, path):
+        # Report the progress in bytes rather than reading the file twice to
+        # count its lines.
+        progress = tqdm.tqdm(total=os.path.getsize(path), unit="B", unit_scale=True)
+        with open(path, "r") as f:
+            for line in f:
+                progress.update(len(line.encode()))
+                yield line
+        progress.close()
 
     def handle(self, **options):
         if not options.get("path") or not os.path.exists(options.get("path")):
@@ -23,37 +60,25 @@ class Command(BaseCommand):
                 "file"
             )
 
-        Book.objects.all().delete()
-        line_count = sum(1 for line in fileinput.input(options.get("path")))
-
-        prog = tqdm.tqdm(total=line_count)
-        with open(options.get("path"), "r") as f:
-            i = 0
-            books = []
-            while line := f.readline():
-                prog.update(1)
-                row = json.loads(line)
-                language_code = row.get("language_code")
-                if language_code.lower() in ("eng", "en-gb", "en-us", "en-ca", "en-au"):
-                    i += 1
-                    books.append(
-                        Book(
-                            title=row.get("title")[:255],
-                            isbn=row.get("isbn13", row.get("isbn", "")),
-                            average_rating=row.get("average_rating") or None,
-                            ratings_count=row.get("ratings_count", 0) or 0,
-                            description=row.get("description"),
-                            url=row.get("url", row.get("link", "")),
-                            image_url=row.get("image_url"),
-                            pages=row.get("num_pages") or None,
-                            publication_year=row.get("publication_year") or None,
-                            ext_id=row.get("book_id"),
-                        )
-                    )
-                    if i >= 10_000:
-                        Book.objects.bulk_create(books)
-                        books = []
-                        i = 0
-
-            if books:
-                Book.objects.bulk_create(books)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "TRUNCATE %s, %s"
+                % (
+                    connection.ops.quote_name(BookReview._meta.db_table),
+                    connection.ops.quote_name(Book._meta.db_table),
+                )
+            )
+
+        report = copy_rows(
+            Book,
+            parse_in_parallel(
+                parse_book,
+                self.read_lines(options["path"]),
+                processes=options["processes"],
+            ),
+            drop_index=True,
+        )
+        self.stdout.write(
+            "Imported %d books in %.1fs, built the BM25 index in %.1fs"
+            % (report.rows, report.copy_time, report.index_time)
+        )
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:27
+
+from django.db import migrations, models
+import paradedb.indexes
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("testapp", "0010_auto_20250406_0734"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tag",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=64)),
+            ],
+            options={
+                "verbose_name": "Tag",
+                "verbose_name_plural": "Tags",
+                "indexes": [
+                    paradedb.indexes.BM25NgramIndex(
+                        fields=["name"], max_gram=10, name="tag_idx", prefix_only=True
+                    )
+                ],
+            },
+        ),
+    ]
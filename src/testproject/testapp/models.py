@@ -2,7 +2,8 @@ from django.contrib.postgres.indexes import GinIndex
 from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 
-from paradedb.indexes import BM25Index
+from paradedb.indexes import BM25Index, BM25NgramIndex
+from paradedb.queryset import ParadeDBManager
 
 
 class Item(models.Model):
@@ -11,6 +12,8 @@ class Item(models.Model):
     alt_name = models.CharField(max_length=64, blank=True, null=True)
     rating = models.DecimalField(max_digits=3, decimal_places=2)
 
+    objects = ParadeDBManager()
+
     class Meta:
         ordering = ("-pk",)
         verbose_name = "Item"
@@ -38,6 +41,8 @@ class Review(models.Model):
     added = models.DateTimeField(auto_now_add=True)
     review = models.TextField()
 
+    objects = ParadeDBManager()
+
     class Meta:
         verbose_name = "Review"
         verbose_name_plural = "Reviews"
@@ -70,6 +75,8 @@ class Book(models.Model):
 
     vector_column = SearchVectorField(null=True)
 
+    objects = ParadeDBManager()
+
     class Meta:
         ordering = ("-pk",)
         verbose_name = "Book"
@@ -94,6 +101,8 @@ class BookReview(models.Model):
     added = models.DateTimeField(auto_now_add=True)
     review = models.TextField()
 
+    objects = ParadeDBManager()
+
     class Meta:
         verbose_name = "Book Review"
         verbose_name_plural = "Book Reviews"
@@ -108,3 +117,27 @@ class BookReview(models.Model):
 
     def __str__(self):
         return self.book.__str__()
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=64)
+
+    objects = ParadeDBManager()
+
+    class Meta:
+        verbose_name = "Tag"
+        verbose_name_plural = "Tags"
+
+        indexes = [
+            # Edge n-grams of the whole name, for autocomplete
+            BM25NgramIndex(
+                fields=["name"],
+                name="tag_idx",
+                min_gram=2,
+                max_gram=10,
+                prefix_only=True,
+            )
+        ]
+
+    def __str__(self):
+        return self.name
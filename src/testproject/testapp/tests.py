@@ -1,9 +1,43 @@
-from testapp.models import Item, Review
+from io import StringIO
 
-from django.db.models import Q
-from django.test import TestCase
+from testapp.models import Book, Item, Review, Tag
 
-from paradedb.functions import Highlight, Score
+from django.apps import apps
+from django.contrib.postgres.indexes import GinIndex
+from django.core.management import CommandError, call_command
+from django.core.paginator import EmptyPage
+from django.db import connection
+from django.db.migrations.state import ProjectState
+from django.db.models import F, FloatField, Q, Subquery
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Abs, Cast
+from django.test import TestCase, TransactionTestCase
+
+from paradedb.aio import gather_searches
+from paradedb.autocomplete import autocomplete, fetch_with_timeout
+from paradedb.bulk import copy_rows
+from paradedb.cache import SearchCache
+from paradedb.facets import RangeFacet, TermsFacet, faceted_search
+from paradedb.federated import federated_search
+from paradedb.functions import (
+    Fuzzy,
+    Highlight,
+    MoreLikeThis,
+    Score,
+    Search,
+    Snippets,
+)
+from paradedb.hybrid import hybrid_search
+from paradedb.indexes import BM25Index, BM25NgramIndex
+from paradedb.instrumentation import SearchInstrumentation
+from paradedb.lookups import Relevance
+from paradedb.operations import (
+    AddBM25IndexConcurrently,
+    RemoveBM25IndexConcurrently,
+)
+from paradedb.pagination import InvalidCursor, KeysetPaginator, SearchPaginator
+from paradedb.plans import PlanGuard, assert_uses_bm25_index, check_plan
+from paradedb.recommendations import recommend
 
 
 class ParadeDBCase(TestCase):
@@ -167,6 +201,107 @@ class ParadeDBCase(TestCase):
 
         assert r1.score > r2.score
 
+    def test_combined_scoring(self):
+        reviews = Review.objects.filter(
+            review__term_search="something",
+            item__description__term_search="province",
+        ).annotate(
+            review_score=Score("review"),
+            item_score=Score("item__description"),
+            sum_score=Score("review", "item__description"),
+            max_score=Score("review", "item__description", combine="max"),
+            weighted_score=Score("review", "item__description", weights=[1, 2]),
+        )
+        self.assertIn('paradedb.score("testapp_item"."id")', str(reviews.query))
+
+        reviews = list(reviews.order_by("-sum_score"))
+        self.assertEqual(len(reviews), 2)
+        for r in reviews:
+            self.assertAlmostEqual(r.sum_score, r.review_score + r.item_score, places=4)
+            self.assertAlmostEqual(
+                r.max_score, max(r.review_score, r.item_score), places=4
+            )
+            self.assertAlmostEqual(
+                r.weighted_score, r.review_score + 2 * r.item_score, places=4
+            )
+        self.assertTrue(reviews[0].sum_score >= reviews[1].sum_score)
+
+        # The field keyword and the annotation order don't matter.
+        searched = Review.objects.filter(item__description__term_search="province")
+        self.assertEqual(
+            str(searched.annotate(score=Score(field="item__description")).query),
+            str(searched.annotate(score=Score("item__description")).query),
+        )
+        qs = Review.objects.annotate(score=Score("item__description")).filter(
+            item__description__term_search="province"
+        )
+        self.assertEqual(str(qs.query).count("JOIN"), 1)
+        self.assertEqual(
+            list(qs.order_by("pk").values_list("pk", "score")),
+            list(
+                searched.annotate(score=Score("item__description"))
+                .order_by("pk")
+                .values_list("pk", "score")
+            ),
+        )
+
+        # Score doesn't join a table that isn't searched.
+        qs = Review.objects.filter(review__term_search="something").annotate(
+            score=Score("item__description")
+        )
+        self.assertEqual(len(qs.query.alias_map), 1)
+        with self.assertRaises(ValueError):
+            list(qs)
+
+        with self.assertRaises(TypeError):
+            Score("review", field="item__description")
+        with self.assertRaises(ValueError):
+            Score("review", "item__description", combine="avg")
+        with self.assertRaises(ValueError):
+            Score("review", "item__description", weights=[1])
+
+    def test_score_in_subqueries(self):
+        scores = list(
+            Review.objects.filter(review__term_search="something")
+            .annotate(score=Score())
+            .order_by("-score")
+            .values_list("score", flat=True)
+        )
+        self.assertTrue(scores)
+
+        # Score selected in a Subquery scores the subquery's rows.
+        qs = Review.objects.filter(item__description__term_search="province").annotate(
+            best=Subquery(
+                Review.objects.filter(review__term_search="something")
+                .annotate(score=Score())
+                .order_by("-score")
+                .values("score")[:1]
+            )
+        )
+        self.assertIn('paradedb.score(U0."id")', str(qs.query))
+        self.assertTrue(qs.exists())
+        for best in qs.values_list("best", flat=True):
+            self.assertAlmostEqual(best, scores[0], places=4)
+
+        # Score on a joined model in a pk__in subquery of another model.
+        best_reviews = (
+            Review.objects.filter(item__description__term_search="province")
+            .annotate(score=Score("item__description"))
+            .order_by("-score", "pk")
+        )
+        self.assertIn(
+            'paradedb.score(U1."id")',
+            str(Item.objects.filter(pk__in=best_reviews.values("item_id")[:1]).query),
+        )
+        self.assertEqual(
+            list(
+                Item.objects.filter(
+                    pk__in=best_reviews.values("item_id")[:1]
+                ).values_list("pk", flat=True)
+            ),
+            [best_reviews[0].item_id],
+        )
+
     def test_joined_self_scoring(self):
         reviews = (
             Review.objects.filter(
@@ -181,3 +316,798 @@ class ParadeDBCase(TestCase):
         r1, r2 = reviews
 
         assert r1.score > r2.score
+
+    def test_keyset_pagination(self):
+        qs = Item.objects.filter(description__term_search="music")
+        expected = list(
+            qs.annotate(score=Score())
+            .order_by("-score", "pk")
+            .values_list("pk", flat=True)
+        )
+        self.assertTrue(len(expected) > 5)
+
+        paginator = KeysetPaginator(qs, per_page=2)
+        seen, cursor = [], None
+        while True:
+            page = paginator.page(cursor)
+            self.assertTrue(len(page) <= 2)
+            seen.extend(item.pk for item in page)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual(seen, expected)
+
+        with self.assertRaises(InvalidCursor):
+            paginator.page("not a cursor")
+
+    def test_search_paginator(self):
+        qs = (
+            Item.objects.filter(description__term_search="music")
+            .annotate(score=Score())
+            .order_by("-score", "pk")
+        )
+        expected = list(qs.values_list("pk", flat=True))
+        self.assertTrue(len(expected) > 5)
+
+        paginator = SearchPaginator(qs, per_page=2, max_count=3)
+        self.assertEqual(paginator.count, 3)
+        self.assertTrue(paginator.count_is_capped)
+        self.assertEqual(paginator.display_count, "3+")
+        self.assertEqual(paginator.num_pages, 2)
+        # The capped count doesn't shorten the last reachable page.
+        self.assertEqual([item.pk for item in paginator.page(2)], expected[2:4])
+        with self.assertRaises(EmptyPage):
+            paginator.page(3)
+
+        paginator = SearchPaginator(qs, per_page=4, count_mode="exact")
+        self.assertEqual(paginator.count, len(expected))
+        self.assertEqual(
+            [item.pk for item in paginator.page(paginator.num_pages)],
+            expected[4 * (paginator.num_pages - 1) :],
+        )
+
+        paginator = SearchPaginator(qs, per_page=2, count_mode="estimate")
+        self.assertTrue(paginator.count > 0)
+        self.assertTrue(paginator.display_count.startswith("~"))
+
+        paginator = SearchPaginator(qs, per_page=2, count_mode="window")
+        with self.assertNumQueries(1):
+            page = paginator.page(2)
+            self.assertEqual(paginator.count, len(expected))
+        self.assertEqual([item.pk for item in page], expected[2:4])
+        self.assertFalse(paginator.count_is_capped)
+
+        paginator = SearchPaginator(qs, per_page=2, count_mode="window")
+        with self.assertRaises(EmptyPage):
+            paginator.page(len(expected))
+
+        with self.assertRaises(ValueError):
+            SearchPaginator(qs, per_page=2, count_mode="all")
+
+    def test_relevance_bounds(self):
+        scores = list(
+            Item.objects.filter(description__term_search="music")
+            .annotate(score=Score())
+            .order_by("-score")
+            .values_list("score", flat=True)
+        )
+        self.assertTrue(len(scores) > 5)
+
+        min_score = scores[4]
+        qs = Item.objects.filter(
+            description__term_search=Relevance("music", min_score=min_score)
+        ).annotate(score=Score())
+        self.assertTrue(qs.count() >= 5)
+        self.assertTrue(all(item.score >= min_score for item in qs))
+
+        qs = Item.objects.filter(
+            description__term_search=Relevance("music", top_k=3)
+        ).annotate(score=Score())
+        self.assertEqual(qs.count(), 3)
+        self.assertEqual(sorted((item.score for item in qs), reverse=True), scores[:3])
+
+        # Both bounds, and the top-k subquery, are read from the BM25 index.
+        assert_uses_bm25_index(
+            Item.objects.filter(
+                description__term_search=Relevance("music", min_score=min_score)
+            )
+        )
+        assert_uses_bm25_index(qs)
+
+    def test_index_field_configuration(self):
+        index = BM25Index(
+            fields=["review", "added", "item"],
+            name="review_typed_idx",
+            field_options={"added": {"fast": False}},
+        )
+        with connection.schema_editor(collect_sql=True, atomic=False) as editor:
+            sql = str(index.create_sql(Review, editor))
+
+        self.assertIn(
+            """numeric_fields='{"item_id": {"fast": true, "indexed": true}}'""", sql
+        )
+        self.assertIn(
+            """datetime_fields='{"added": {"fast": false, "indexed": true}}'""", sql
+        )
+        self.assertIn("""text_fields='{"review": {"fast": true""", sql)
+
+        _, _, kwargs = index.deconstruct()
+        self.assertEqual(kwargs["field_options"], {"added": {"fast": False}})
+
+        with self.assertRaises(ValueError):
+            BM25Index(fields=["review"], name="review_idx", field_options={"added": {}})
+
+    def test_index_text_field_options(self):
+        index = BM25Index(
+            fields=["title", "isbn", "description"],
+            name="book_options_idx",
+            field_options={
+                "isbn": {"tokenizer": "keyword", "record": "basic", "fast": False},
+                "title": {"stemmer": None, "normalizer": "lowercase"},
+            },
+        )
+        with connection.schema_editor(collect_sql=True, atomic=False) as editor:
+            sql = str(index.create_sql(Book, editor))
+
+        self.assertIn(
+            '"isbn": {"fast": false, "tokenizer": {"type": "keyword"}, '
+            '"record": "basic"}',
+            sql,
+        )
+        self.assertIn(
+            '"title": {"fast": true, "tokenizer": {"type": "default"}, '
+            '"normalizer": "lowercase"}',
+            sql,
+        )
+        self.assertIn(
+            '"description": {"fast": true, "tokenizer": {"type": "default", '
+            '"stemmer": "English"}}',
+            sql,
+        )
+
+        with self.assertRaises(ValueError):
+            BM25Index(
+                fields=["isbn"], name="book_idx", field_options={"isbn": {"record": 1}}
+            )
+
+    def test_ngram_index_options(self):
+        index = BM25NgramIndex(
+            fields=["title", "description"],
+            name="book_ngram_idx",
+            max_gram=4,
+            field_options={
+                "title": {"min_gram": 1, "max_gram": 8, "prefix_only": True}
+            },
+        )
+        with connection.schema_editor(collect_sql=True, atomic=False) as editor:
+            sql = str(index.create_sql(Book, editor))
+
+        self.assertIn(
+            '"title": {"fast": true, "tokenizer": {"type": "ngram", "min_gram": 1, '
+            '"max_gram": 8, "prefix_only": true}}',
+            sql,
+        )
+        self.assertIn(
+            '"description": {"fast": true, "tokenizer": {"type": "ngram", '
+            '"min_gram": 2, "max_gram": 4, "prefix_only": false}}',
+            sql,
+        )
+        _, _, kwargs = index.deconstruct()
+        self.assertEqual(kwargs["max_gram"], 4)
+        self.assertNotIn("min_gram", kwargs)
+
+        with self.assertRaises(ValueError):
+            BM25NgramIndex(
+                fields=["title"],
+                name="book_idx",
+                field_options={"title": {"min_gram": 5}},
+            )
+
+    def test_rebuild_bm25_indexes_command(self):
+        out = StringIO()
+        call_command("rebuild_bm25_indexes", "--list", stdout=out)
+        for name in ("item_idx", "review_idx", "book_idx", "book_review_idx"):
+            self.assertIn(name, out.getvalue())
+
+        out = StringIO()
+        call_command(
+            "rebuild_bm25_indexes",
+            "review_idx",
+            maintenance_work_mem="64MB",
+            parallel_workers=2,
+            progress_interval=0,
+            stdout=out,
+        )
+        self.assertIn("Set maintenance_work_mem = 64MB", out.getvalue())
+        self.assertIn("Rebuilt review_idx in", out.getvalue())
+        self.assertNotIn("item_idx", out.getvalue())
+        self.assertTrue(
+            Review.objects.filter(
+                item__description__term_search="Unsourced material"
+            ).exists()
+        )
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_bm25_indexes", "no_such_idx", stdout=StringIO())
+
+    def test_faceted_search(self):
+        qs = Item.objects.filter(description__term_search="music")
+        result = faceted_search(
+            qs,
+            facets={
+                "rating": RangeFacet("rating", [(None, 2.5), (2.5, None)]),
+                "rating_terms": TermsFacet("rating", size=3),
+            },
+            limit=5,
+        )
+
+        self.assertEqual(result.total, qs.count())
+        self.assertEqual(
+            [item.pk for item in result.hits],
+            list(
+                qs.annotate(score=Score())
+                .order_by("-score", "pk")
+                .values_list("pk", flat=True)[:5]
+            ),
+        )
+        self.assertTrue(all(hasattr(item, "score") for item in result.hits))
+
+        below, above = result.facets["rating"]
+        self.assertEqual(below["count"], qs.filter(rating__lt=2.5).count())
+        self.assertEqual(above["count"], qs.filter(rating__gte=2.5).count())
+
+        terms = result.facets["rating_terms"]
+        self.assertTrue(len(terms) <= 3)
+        for bucket in terms:
+            self.assertEqual(bucket["count"], qs.filter(rating=bucket["key"]).count())
+
+    def test_merged_sibling_lookups(self):
+        names = set(
+            Item.objects.filter(name__term_search="music").values_list("pk", flat=True)
+        )
+        descriptions = set(
+            Item.objects.filter(description__phrase_search="music").values_list(
+                "pk", flat=True
+            )
+        )
+        self.assertTrue(names)
+        self.assertTrue(descriptions)
+
+        qs = Item.objects.filter(
+            Q(name__term_search="music") | Q(description__phrase_search="music")
+        )
+        sql = str(qs.query)
+        self.assertEqual(sql.count("@@@"), 1)
+        self.assertIn("paradedb.boolean(should => ARRAY[", sql)
+        self.assertEqual(set(qs.values_list("pk", flat=True)), names | descriptions)
+
+        qs = Item.objects.filter(
+            name__term_search="music", description__phrase_search="music"
+        )
+        sql = str(qs.query)
+        self.assertEqual(sql.count("@@@"), 1)
+        self.assertIn("paradedb.boolean(must => ARRAY[", sql)
+        self.assertEqual(set(qs.values_list("pk", flat=True)), names & descriptions)
+
+        qs = Item.objects.exclude(
+            Q(name__term_search="music") | Q(description__phrase_search="music")
+        )
+        self.assertEqual(qs.count(), Item.objects.count() - len(names | descriptions))
+
+        # Multi-word phrases and query parser special characters match the
+        # same rows merged or not.
+        lookups = [
+            {"name__fuzzy_term_search": "(skier)"},
+            {"name__term_search": "Proto-Indo-European"},
+            {"description__phrase_search": "Province of Pennsylvania"},
+        ]
+        unmerged = [
+            set(Item.objects.filter(**lookup).values_list("pk", flat=True))
+            for lookup in lookups
+        ]
+        self.assertTrue(all(unmerged))
+
+        qs = Item.objects.filter(Q(**lookups[0]) | Q(**lookups[1]) | Q(**lookups[2]))
+        self.assertEqual(str(qs.query).count("@@@"), 1)
+        self.assertEqual(set(qs.values_list("pk", flat=True)), set.union(*unmerged))
+
+        qs = Item.objects.filter(
+            description__phrase_search="Province of Pennsylvania",
+            description__fuzzy_term_search="Pennsylvania:",
+        )
+        self.assertEqual(str(qs.query).count("@@@"), 1)
+        self.assertEqual(set(qs.values_list("pk", flat=True)), unmerged[2])
+
+    def test_multi_field_search(self):
+        expected = set(
+            Item.objects.filter(
+                Q(name__term_search="music")
+                | Q(alt_name__term_search="music")
+                | Q(description__term_search="music")
+            ).values_list("pk", flat=True)
+        )
+        qs = Item.objects.filter(Search("music"))
+        self.assertEqual(str(qs.query).count("@@@"), 1)
+        self.assertEqual(set(qs.values_list("pk", flat=True)), expected)
+
+        names = set(
+            Item.objects.filter(name__term_search="music").values_list("pk", flat=True)
+        )
+        qs = Item.objects.filter(Search("music", fields=["name"]))
+        self.assertEqual(set(qs.values_list("pk", flat=True)), names)
+
+        # Boosting the name ranks name matches first
+        top = (
+            Item.objects.filter(Search("music", boosts={"name": 100}))
+            .annotate(score=Score())
+            .order_by("-score")
+            .first()
+        )
+        self.assertIn(top.pk, names)
+
+        with self.assertRaises(ValueError):
+            list(Item.objects.filter(Search("music", fields=["rating", "nope"])))
+
+    def test_joined_highlighting(self):
+        review = (
+            Review.objects.filter(item__description__term_search="Unsourced")
+            .annotate(hl=Highlight("item__description"))
+            .first()
+        )
+        self.assertIn("<em>Unsourced</em>", review.hl)
+
+    def test_snippets(self):
+        item = (
+            Item.objects.filter(description__term_search="Colpoys")
+            .annotate(snippets=Snippets("description", max_num_chars=50, limit=3))
+            .first()
+        )
+        self.assertTrue(1 < len(item.snippets) <= 3)
+        self.assertTrue(all("<em>Colpoys</em>" in s for s in item.snippets))
+
+    def test_late_highlighting(self):
+        qs = (
+            Item.objects.filter(description__term_search="music")
+            .annotate(score=Score())
+            .order_by("-score")
+        )
+        expected = list(qs.values_list("pk", flat=True)[:3])
+
+        items = list(qs.highlight(hl=Highlight("description"))[:3])
+        self.assertEqual([item.pk for item in items], expected)
+        for item in items:
+            self.assertIn("<em>", item.hl)
+            self.assertTrue(item.score > 0)
+
+    def test_two_phase(self):
+        qs = Item.objects.filter(description__term_search="music")
+        expected = list(
+            qs.annotate(score=Score())
+            .order_by("-score", "pk")
+            .values_list("pk", "score")[:5]
+        )
+
+        with self.assertNumQueries(2):
+            items = list(qs.two_phase()[:5])
+        self.assertEqual([(item.pk, item.score) for item in items], expected)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(list(qs.two_phase().filter(pk=0)), [])
+
+        reviews = Review.objects.filter(review__term_search="something")
+        with self.assertNumQueries(2):
+            reviews = list(reviews.select_related("item").two_phase())
+            self.assertTrue(reviews)
+            self.assertTrue(all(review.item.name for review in reviews))
+
+        items = Item.objects.filter(description__term_search="province")
+        expected = {
+            item.pk: {review.pk for review in item.review_set.all()} for item in items
+        }
+        self.assertTrue(any(expected.values()))
+        with self.assertNumQueries(3):
+            items = list(items.prefetch_related("review_set").two_phase())
+            self.assertEqual(
+                {
+                    item.pk: {review.pk for review in item.review_set.all()}
+                    for item in items
+                },
+                expected,
+            )
+
+    def test_search_cache(self):
+        cache = SearchCache(maxsize=10)
+        qs = Item.objects.filter(description__term_search="music").cached(cache)[:5]
+        expected = [(item.pk, item.score) for item in qs]
+        self.assertEqual(len(expected), 5)
+
+        # Only the rows are loaded, the ids and scores come from the cache.
+        with self.assertNumQueries(1):
+            self.assertEqual([(item.pk, item.score) for item in qs.all()], expected)
+
+        item = Item.objects.get(pk=expected[0][0])
+        item.description = "nothing to see here"
+        item.save()
+        with self.assertNumQueries(2):
+            self.assertNotIn(item.pk, [i.pk for i in qs.all()])
+
+        Item.objects.filter(pk=expected[1][0]).update(description="nothing")
+        with self.assertNumQueries(2):
+            self.assertNotIn(expected[1][0], [i.pk for i in qs.all()])
+
+        # Writes to the models searched in subqueries invalidate them too.
+        reviews = Review.objects.filter(
+            review__term_search="something",
+            item__in=Item.objects.filter(description__term_search="Unsourced"),
+        ).cached(cache)
+        self.assertEqual(cache.get_models(reviews.query), [Item, Review])
+        self.assertEqual([review.pk for review in reviews], [1])
+        Item.objects.filter(pk=100).update(description="nothing")
+        self.assertEqual(list(reviews.all()), [])
+
+    def test_federated_search(self):
+        with self.assertNumQueries(3):
+            results = federated_search(
+                "something", [(Item, ["description"]), (Review, ["review"])], limit=200
+            )
+        self.assertEqual({obj.pk for obj in results if isinstance(obj, Review)}, {1, 2})
+        self.assertEqual(
+            {obj.pk for obj in results if isinstance(obj, Item)},
+            set(
+                Item.objects.filter(description__term_search="something").values_list(
+                    "pk", flat=True
+                )
+            ),
+        )
+        scores = [obj.score for obj in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+        results = federated_search("something", [Item, Review], limit=1)
+        self.assertEqual(len(results), 1)
+
+    def test_hybrid_search(self):
+        # The distance of the rating to 5 stands in for a vector distance.
+        distance = Cast(Abs(F("rating") - 5), FloatField())
+        matches = set(
+            Item.objects.filter(description__term_search="music").values_list(
+                "pk", flat=True
+            )
+        )
+
+        with self.assertNumQueries(1):
+            results = list(
+                Item.objects.hybrid_search(
+                    "music", distance, fields=["description"], limit=5, top_k=10
+                )
+            )
+        self.assertEqual(len(results), 5)
+        scores = [item.score for item in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(all(isinstance(item, Item) for item in results))
+
+        results = hybrid_search(
+            Item,
+            "music",
+            distance,
+            fields=["description"],
+            limit=200,
+            top_k=200,
+            fusion="weighted",
+            weights=(1, 0),
+        )
+        self.assertEqual({item.pk for item in results if item.score > 0}, matches)
+        self.assertEqual(max(item.score for item in results), 1)
+
+        with self.assertRaises(ValueError):
+            hybrid_search(Item, "music", distance, fusion="sum")
+
+    def test_more_like_this(self):
+        item = Item.objects.filter(description__term_search="music").first()
+        similar = list(
+            Item.objects.filter(
+                MoreLikeThis(item, max_query_terms=10, min_doc_frequency=1)
+            )
+            .annotate(score=Score())
+            .order_by("-score", "pk")[:5]
+        )
+        self.assertTrue(similar)
+        self.assertNotIn(item, similar)
+        scores = [i.score for i in similar]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+        self.assertTrue(
+            Item.objects.filter(
+                MoreLikeThis(item.pk, exclude_document=False, min_doc_frequency=1)
+            )
+            .filter(pk=item.pk)
+            .exists()
+        )
+
+        seeds = list(Item.objects.order_by("pk").values_list("pk", flat=True)[:3])
+        with self.assertNumQueries(2):
+            recommendations = recommend(
+                Item, seeds + [item], limit=3, max_query_terms=10, min_doc_frequency=1
+            )
+        self.assertEqual(list(recommendations), seeds + [item.pk])
+        for pk, items in recommendations.items():
+            self.assertTrue(len(items) <= 3)
+            self.assertNotIn(pk, [i.pk for i in items])
+        self.assertEqual(
+            [i.pk for i in recommendations[item.pk]], [i.pk for i in similar[:3]]
+        )
+
+    def test_copy_rows(self):
+        rows = [
+            {"name": "Copied 1", "description": "quixotic\ttabs", "rating": 1},
+            ("Copied 2", "quixotic \\ backslashes\nand lines", None, "2.5"),
+            Item(name="Copied 3", description="quixotic", alt_name="x", rating=3),
+        ]
+        report = copy_rows(
+            Item,
+            (row for row in rows),
+            fields=["name", "description", "alt_name", "rating"],
+            drop_index=True,
+            progress_interval=0,
+        )
+        self.assertEqual(report.rows, 3)
+        self.assertEqual(
+            set(
+                Item.objects.filter(description__term_search="quixotic").values_list(
+                    "name", flat=True
+                )
+            ),
+            {"Copied 1", "Copied 2", "Copied 3"},
+        )
+        self.assertEqual(
+            Item.objects.get(name="Copied 2").description,
+            "quixotic \\ backslashes\nand lines",
+        )
+
+        # Related objects are accepted and auto_now_add is set.
+        item = Item.objects.get(name="Copied 1")
+        report = copy_rows(
+            Review,
+            [
+                Review(item=item, review="quixotic instance"),
+                {"item": item, "review": "quixotic dict"},
+                {"item_id": item.pk, "review": "quixotic id"},
+                (item.pk, None, "quixotic tuple"),
+            ],
+        )
+        self.assertEqual(report.rows, 4)
+        reviews = Review.objects.filter(review__term_search="quixotic")
+        self.assertEqual(len(reviews), 4)
+        for review in reviews:
+            self.assertEqual(review.item, item)
+            self.assertIsNotNone(review.added)
+
+    def test_instrumentation(self):
+        class Sink:
+            def __init__(self):
+                self.executions = []
+
+            def record(self, execution):
+                self.executions.append(execution)
+
+        sink = Sink()
+        instrumentation = SearchInstrumentation(
+            sinks=[sink], slow_threshold=0, explain_rate=1
+        )
+        with connection.execute_wrapper(instrumentation):
+            items = list(Item.objects.filter(description__term_search="music"))
+            list(Item.objects.filter(Search("shoes", fields=["name"])))
+            Item.objects.count()
+
+        self.assertEqual(len(sink.executions), 2)
+        execution = sink.executions[0]
+        self.assertEqual(execution.lookups, ["term_search"])
+        self.assertEqual(execution.indexes, ["item_idx"])
+        self.assertEqual(execution.rows, len(items))
+        self.assertGreater(execution.duration, 0)
+        self.assertIn("Plan", execution.plan[0])
+        self.assertEqual(sink.executions[1].lookups, ["search"])
+
+        # The SQL is only tagged while an ExecuteWrapper is installed.
+        qs = Item.objects.filter(description__term_search="music")
+        self.assertNotIn("paradedb:", str(qs.query))
+        with connection.execute_wrapper(instrumentation):
+            self.assertIn("paradedb:term_search:item_idx", str(qs.query))
+        self.assertNotIn("paradedb:", str(qs.query))
+        instrumentation.install()
+        try:
+            self.assertIn("paradedb:term_search:item_idx", str(qs.query))
+        finally:
+            instrumentation.uninstall()
+        self.assertNotIn("paradedb:", str(qs.query))
+
+    def test_plan_assertions(self):
+        assert_uses_bm25_index(Item.objects.filter(description__term_search="music"))
+        with self.assertRaises(AssertionError):
+            assert_uses_bm25_index(Item.objects.filter(name="music"))
+
+        seq_scan = {
+            "Plan": {
+                "Node Type": "Seq Scan",
+                "Relation Name": "testapp_item",
+                "Filter": "(description @@@ 'music'::text)",
+            }
+        }
+        self.assertEqual(len(check_plan(seq_scan, ["item_idx"])), 2)
+
+        with connection.execute_wrapper(PlanGuard(action="raise")):
+            self.assertTrue(
+                Item.objects.filter(description__term_search="music").exists()
+            )
+
+    def test_autocomplete(self):
+        self.assertEqual(
+            set(autocomplete(Item.objects.all(), "name", "university")),
+            set(
+                Item.objects.filter(name__term_search="university").values_list(
+                    "name", flat=True
+                )[:10]
+            ),
+        )
+        self.assertEqual(
+            len(autocomplete(Item.objects.all(), "name", "university", limit=1)), 1
+        )
+        self.assertEqual(autocomplete(Item.objects.all(), "name", "  "), [])
+
+        # The suggestions of a prefix are cached.
+        with self.assertNumQueries(0):
+            autocomplete(Item.objects.all(), "name", "university")
+
+    def test_autocomplete_ngram_prefix(self):
+        Tag.objects.bulk_create(
+            Tag(name=name)
+            for name in ("Running shoes", "Running socks", "Rugby ball", "Shoe polish")
+        )
+        self.assertEqual(
+            sorted(autocomplete(Tag.objects.all(), "name", "Runn")),
+            ["Running shoes", "Running socks"],
+        )
+        self.assertEqual(
+            autocomplete(Tag.objects.all(), "name", "Rugb"), ["Rugby ball"]
+        )
+        # Shorter than the index's min_gram.
+        with self.assertNumQueries(0):
+            self.assertEqual(autocomplete(Tag.objects.all(), "name", "R"), [])
+
+    def test_fetch_with_timeout(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW statement_timeout")
+            timeout = cursor.fetchone()[0]
+
+        slow = Item.objects.annotate(
+            delay=RawSQL("pg_sleep(%s)::text", (0.5,))
+        ).values_list("pk", "delay")[:1]
+        self.assertIsNone(fetch_with_timeout(slow, 0.01))
+
+        # The setting is restored and the transaction still usable.
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW statement_timeout")
+            self.assertEqual(cursor.fetchone()[0], timeout)
+        self.assertEqual(
+            fetch_with_timeout(Item.objects.values_list("pk")[:1], 5),
+            list(Item.objects.values_list("pk")[:1]),
+        )
+
+    def test_fuzzy_expression(self):
+        names = Item.objects.filter(
+            Fuzzy("musik", fields=["name"], distance=1)
+        ).values_list("name", flat=True)
+        self.assertIn("Original Music from The TV Show The Untouchables", names)
+        self.assertTrue(
+            Item.objects.filter(Fuzzy("msuic", fields=["name"], distance=1)).exists()
+        )
+        self.assertFalse(
+            Item.objects.filter(
+                Fuzzy(
+                    "msuic", fields=["name"], distance=1, transposition_cost_one=False
+                )
+            ).exists()
+        )
+        self.assertTrue(
+            Item.objects.filter(Fuzzy("muzi", fields=["name"], prefix=True)).exists()
+        )
+
+    def test_adaptive_search(self):
+        with self.assertNumQueries(2):
+            qs = Item.objects.adaptive_search("musik", fields=["name"], min_hits=1)
+        self.assertIsInstance(qs.query.where.children[0], Fuzzy)
+        self.assertEqual(qs.query.where.children[0].distance, 1)
+
+        with self.assertNumQueries(1):
+            qs = Item.objects.adaptive_search("music", fields=["name"], min_hits=1)
+        self.assertNotIsInstance(qs.query.where.children[0], Fuzzy)
+
+    async def test_async_streaming(self):
+        qs = (
+            Item.objects.filter(description__term_search="music")
+            .annotate(score=Score())
+            .order_by("-score", "pk")
+            .highlight(hl=Highlight("description"))[:5]
+        )
+        items = [item async for item in qs.aiterator()]
+        self.assertEqual(len(items), 5)
+        for item in items:
+            self.assertIn("<em>", item.hl)
+
+        paginator = KeysetPaginator(
+            Item.objects.filter(description__term_search="music"), per_page=5
+        )
+        page = await paginator.apage()
+        self.assertEqual([item.pk for item in page], [item.pk for item in items])
+
+
+class ConcurrentSearchCase(TransactionTestCase):
+    # The searches run on connections of their own: the fixture must be
+    # committed.
+    available_apps = ["testapp"]
+    fixtures = ["testapp/test_data.json"]
+
+    async def test_gather_searches(self):
+        items = Item.objects.filter(description__term_search="music")[:5]
+        books = Book.objects.filter(description__term_search="music").two_phase()[:5]
+        results = await gather_searches(
+            items=items,
+            books=books,
+            facets=lambda: faceted_search(
+                Item.objects.filter(description__term_search="music"),
+                facets={"rating": TermsFacet("rating")},
+            ),
+        )
+        self.assertEqual(set(results), {"items", "books", "facets"})
+        self.assertEqual(
+            [item.pk for item in results["items"]],
+            [item.pk async for item in items],
+        )
+        self.assertEqual(
+            results["facets"].total,
+            await Item.objects.filter(description__term_search="music").acount(),
+        )
+
+        positional = await gather_searches(items, books)
+        self.assertEqual(len(positional), 2)
+
+
+class OperationsCase(TransactionTestCase):
+    available_apps = ["testapp"]
+
+    def get_index_names(self):
+        with connection.cursor() as cursor:
+            return connection.introspection.get_constraints(
+                cursor, Review._meta.db_table
+            ).keys()
+
+    def test_concurrent_index_operations(self):
+        project_state = ProjectState.from_apps(apps)
+        new_state = project_state.clone()
+        operation = RemoveBM25IndexConcurrently(
+            "review", "review_idx", progress_interval=0.1
+        )
+        self.assertEqual(
+            operation.describe(),
+            "Concurrently remove BM25 index review_idx from review",
+        )
+        operation.state_forwards("testapp", new_state)
+        self.assertIn("review_idx", self.get_index_names())
+
+        with connection.schema_editor(atomic=False) as editor:
+            operation.database_forwards("testapp", editor, project_state, new_state)
+        self.assertNotIn("review_idx", self.get_index_names())
+
+        with connection.schema_editor(atomic=False) as editor:
+            operation.database_backwards("testapp", editor, new_state, project_state)
+        self.assertIn("review_idx", self.get_index_names())
+
+        name, args, kwargs = operation.deconstruct()
+        self.assertEqual(name, "RemoveBM25IndexConcurrently")
+        self.assertEqual(kwargs["progress_interval"], 0.1)
+
+    def test_add_requires_bm25_index(self):
+        with self.assertRaises(ValueError):
+            AddBM25IndexConcurrently(
+                "review", GinIndex(fields=["review"], name="review_gin_idx")
+            )